@@ -0,0 +1,54 @@
+from big_ol_pile_of_manim_imports import *
+from manim_pathing.algorithms.dijkstra import DijkstraGraph, DijkstraGrid
+from manim_pathing.core import AStarSearch, GridAStarSearch
+from manim_pathing.helpers import *
+
+class AStarGraph(DijkstraGraph):
+    """
+    DijkstraGraph, but expanding vertices in order of distance plus the straight line distance
+    to the end, scaled so it never overestimates the remaining edge weight.
+    """
+
+    def make_core_search(self) -> AStarSearch:
+        return AStarSearch(self.core, self.core_id(self.start), self.core_id(self.end))
+
+
+class AStarGrid(DijkstraGrid):
+    """DijkstraGrid, but expanding squares in order of distance plus VisualGrid.dist to the end."""
+
+    def make_core_search(self) -> GridAStarSearch:
+        return GridAStarSearch(self.map, self.start_cell, self.end_cell, method=self.TRAVERSAL_METHOD)
+
+
+class TestScene(Scene):
+
+    def construct(self):
+        c = AStarGraph('small.graph', self)
+        c.after_init()
+        c.draw_vertices()
+        self.play(c.draw_edges())
+        self.play(c.draw_edge_weights())
+
+        c.search_init('F', 'C')
+        c.search()
+        self.play(Timeline(*c.draw_path_propogation(
+            c.vert_path(), YELLOW,
+            after_hit=GREEN, vertex_color=PURPLE, push_to_iterable=True
+        )))
+
+
+class GridTestScene(Scene):
+
+    def construct(self):
+        c = AStarGrid('small.map', self)
+        c.after_init()
+        self.play(*c.draw_vertices())
+
+        c.search_init((6, 1), (0, 8))
+        c.search()
+        path = c.vert_path()
+        for square1, square2 in zip(path[:-1], path[1:]):
+            self.play(Timeline(*c.propogate_color_change(
+                square1, [square2], YELLOW,
+                after_hit_color=GREEN, push_to_iterable=True,
+            )))
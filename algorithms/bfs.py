@@ -3,6 +3,8 @@ from typing import List
 
 from big_ol_pile_of_manim_imports import *
 from manim_pathing.bases.graph import VisualGraph, Vertex
+from manim_pathing.bases.grid import VisualGrid
+from manim_pathing.core import BFSSearch, GridBFSSearch, TraceRecorder, expansions
 from manim_pathing.helpers import *
 
 class BFSGraph(VisualGraph):
@@ -16,6 +18,8 @@ class BFSGraph(VisualGraph):
     ANIMATE_EXPAND_AT_ONCE = False
 
     def after_init(self):
+        if self.headless:
+            return
         if self.ANIMATE_ANNOTATE_DISTANCE:
             for vertex in self.all_vertices:
                 vertex.change_text('', self.scene)
@@ -32,7 +36,7 @@ class BFSGraph(VisualGraph):
     def search_init(self, start, end):
         super().search_init(start, end)
 
-        if self.ANIMATE_HIGHLIGHT_EXPANDING:
+        if self.ANIMATE_HIGHLIGHT_EXPANDING and not self.headless:
             self.highlight.next_to(self.start, UP)
             self.scene.add_foreground_mobjects(self.highlight)
             self.scene.play(ShowCreation(self.highlight))
@@ -41,32 +45,44 @@ class BFSGraph(VisualGraph):
         self.distances = defaultdict(lambda: None)
         self.distances[self.start] = 0
         self.expanding: List[Vertex] = [self.start]
+        self.core_search = BFSSearch(self.core, self.core_id(self.start), self.core_id(self.end))
+        self.recorder = TraceRecorder(self.core_search)
+        self.trace = self.recorder.trace
 
-        if self.ANIMATE_ANNOTATE_DISTANCE:
+        if self.ANIMATE_ANNOTATE_DISTANCE and not self.headless:
             self.scene.play(self.start.change_text('$0$', self.scene, anim=True, fade_dir=DOWN))
 
     def search(self, anim=True):
-        while self.predecessors[self.end] is None:
-            self.iteration += 1
-            self.search_step(anim=anim)
-            if self.predecessors[self.end] is None and anim:
-                # Slightly tint the next set of vertices.
+        if not anim or self.headless:
+            # Nothing to draw, so run the whole search on the arrays.
+            self.core_search.run()
+            self.sync_from_core()
+            return
+        self.play_steps(self.recorder.steps(), anim=anim)
+
+    def search_step(self, anim=True):
+        self.play_step(self.recorder.step(), anim=anim)
+
+    def play_steps(self, steps, anim=True):
+        """Play each layer's trace events in turn, whether from the live search or a recorded trace."""
+        for events in steps:
+            if self.iteration and anim:
+                # Slightly tint the set of vertices about to be expanded.
                 self.scene.play(*(
                     ApplyMethod(vert.set_fill, self.CURRENT_VERTS)
                     for vert in self.expanding
                 ))
+            self.iteration += 1
+            self.play_step(events, anim=anim)
         if anim:
             self.scene.play(ApplyMethod(self.end.set_fill, self.END_COLOR))
 
-    def search_step(self, anim=True):
+    def play_step(self, events, anim=True):
         new_expanding = []
         all_anims = []
-        for vertex in self.expanding:
-            success_function = (
-                lambda vert:
-                self.predecessors[vert] is None and vert != self.start  # Vertex hasn't been looked at
-            )
-            end_vertices = list(filter(success_function, self.neighbours(vertex)))
+        for vertex_id, _, successes, fail_ids in expansions(events):
+            vertex = self.core_vertex(vertex_id)
+            end_vertices = [self.core_vertex(end) for end, _ in successes]
             if self.ANIMATE_DISCOVERY and anim:
                 success_anims = self.propogate_color_change(
                     vertex, end_vertices, self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
@@ -78,19 +94,22 @@ class BFSGraph(VisualGraph):
                     combined_anims[key] = success_anims[key]
                 if self.ANIMATE_ALL_EDGE_PROPOGATION:
                     fail_anims = self.propogate_color_change(
-                        vertex, list(filter(lambda x: not success_function(x), self.neighbours(vertex))), self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+                        vertex, [self.core_vertex(end) for end in fail_ids], self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
                         on_hit_color=self.EDGE_FAIL_FLASH, after_hit_color=self.EDGE_FAIL,
                         push_to_iterable=False,
                     )
                     for key in fail_anims:
                         combined_anims[key] = combined_anims.get(key, []) + fail_anims[key]
-                combined_anims[vertex] = []
+                combined_anims[vertex] = combined_anims.get(vertex, [])
                 if self.ANIMATE_EXPAND_WHILE_PROPOGATING and vertex != self.start:
                     vertex.set_fill(self.EXPAND_COLOR)
                     combined_anims[vertex].append(vertex.get_update_ring())
                 if self.ANIMATE_ANNOTATE_DISTANCE:
                     for end in end_vertices:
-                        text_change = after_animation_separate(end.change_text(f'${self.iteration}$', self.scene, anim=True, fade_dir=DOWN), combined_anims[end][0])
+                        text_change = after_delay(
+                            end.change_text(f'${self.iteration}$', self.scene, anim=True, fade_dir=DOWN),
+                            self.arrival_time(vertex, end, self.ANIMATE_PROPOGATE_EDGES_AT_ONCE),
+                        )
                         combined_anims[end].append(text_change)
                     self.update_foreground()
                 if self.ANIMATE_HIGHLIGHT_EXPANDING:
@@ -102,13 +121,13 @@ class BFSGraph(VisualGraph):
                     for animation in anim_set
                 ]
                 if not self.ANIMATE_EXPAND_AT_ONCE:
-                    self.scene.play(*iterable_anims, lag_ratio=0)
+                    self.scene.play(Timeline(*iterable_anims), lag_ratio=0)
                     for end in end_vertices:
                         end.set_fill(self.DISCOVER_COLOR)
                 else:
                     all_anims.extend(iterable_anims)
 
-            if not self.ANIMATE_EXPAND_AT_ONCE:
+            if anim and not self.ANIMATE_EXPAND_AT_ONCE:
                 self.clean_edges()
 
             for end in end_vertices:
@@ -121,7 +140,16 @@ class BFSGraph(VisualGraph):
 
         self.expanding = new_expanding
         if anim and self.ANIMATE_DISCOVERY and self.ANIMATE_EXPAND_AT_ONCE:
-            self.scene.play(*all_anims, lag_ratio=0)
+            self.scene.play(Timeline(*all_anims), lag_ratio=0)
+
+    def sync_from_core(self):
+        """Copy the result of a core search back onto the vertices."""
+        self.iteration = self.core_search.layer
+        for vertex_id in np.flatnonzero(self.core_search.distances > 0).tolist():
+            vertex = self.core_vertex(vertex_id)
+            self.distances[vertex] = int(self.core_search.distances[vertex_id])
+            self.predecessors[vertex] = self.core_vertex(self.core_search.predecessors[vertex_id])
+        self.expanding = [self.core_vertex(vertex_id) for vertex_id in self.core_search.frontier.tolist()]
 
     def vert_path(self):
         verts = [self.end]
@@ -132,6 +160,120 @@ class BFSGraph(VisualGraph):
         return verts
 
 
+class BFSGrid(VisualGrid):
+
+    ANIMATE_HIGHLIGHT_EXPANDING = True
+    ANIMATE_DISCOVERY = True
+    ANIMATE_ALL_EDGE_PROPOGATION = True
+    ANIMATE_PROPOGATE_EDGES_AT_ONCE = True
+    ANIMATE_EXPAND_WHILE_PROPOGATING = True
+    ANIMATE_EXPAND_AT_ONCE = False
+
+    def after_init(self):
+        if self.headless:
+            return
+        if self.ANIMATE_HIGHLIGHT_EXPANDING:
+            self.highlight = Polygon(
+                (-0.2, 0.2, 0),
+                (0, 0, 0),
+                (0.2, 0.2, 0),
+                (0, 0, 0),
+                color=WHITE,
+            )
+
+    def search_init(self, start, end):
+        super().search_init(start, end)
+
+        if self.ANIMATE_HIGHLIGHT_EXPANDING and not self.headless:
+            self.highlight.next_to(self.cell_top(self.start_cell), UP)
+            self.scene.add_foreground_mobjects(self.highlight)
+            self.scene.play(ShowCreation(self.highlight))
+
+        self.core_search = GridBFSSearch(self.map, self.start_cell, self.end_cell, method=self.TRAVERSAL_METHOD)
+        self.recorder = TraceRecorder(self.core_search)
+        self.trace = self.recorder.trace
+
+    def search(self, anim=True):
+        if not anim or self.headless:
+            self.core_search.run()
+            self.iteration = self.core_search.layer
+            return
+        self.play_steps(self.recorder.steps(), anim=anim)
+
+    def search_step(self, anim=True):
+        self.play_step(self.recorder.step(), anim=anim)
+
+    def play_steps(self, steps, anim=True):
+        """Play each layer's trace events in turn, whether from the live search or a recorded trace."""
+        frontier = []
+        for events in steps:
+            if frontier and anim:
+                # Slightly tint the set of squares about to be expanded.
+                self.scene.play(self.fill_cells(frontier, self.CURRENT_VERTS, anim=True))
+            self.iteration += 1
+            self.play_step(events, anim=anim)
+            frontier = [end for _, _, successes, _ in expansions(events) for end, _ in successes]
+        if anim:
+            self.scene.play(self.fill_cells([self.end], self.END_COLOR, anim=True))
+
+    def play_step(self, events, anim=True):
+        all_anims = []
+        for cell, _, successes, fail_cells in expansions(events):
+            if not anim:
+                continue
+            square = self.cell_square(cell)
+            end_squares = [self.cell_square(end) for end, _ in successes]
+            touched = [self[square, end] for end in end_squares]
+            if self.ANIMATE_DISCOVERY:
+                success_anims = self.propogate_color_change(
+                    square, end_squares, self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+                    end_color=self.DISCOVER_COLOR, on_hit_color=self.EDGE_SUCCESS_FLASH, after_hit_color=self.EDGE_SUCCESS,
+                    push_to_iterable=False,
+                )
+                combined_anims = {}
+                for key in success_anims:
+                    combined_anims[key] = success_anims[key]
+                if self.ANIMATE_ALL_EDGE_PROPOGATION:
+                    fail_squares = [self.cell_square(end) for end in fail_cells]
+                    touched.extend(self[square, end] for end in fail_squares)
+                    fail_anims = self.propogate_color_change(
+                        square, fail_squares, self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+                        on_hit_color=self.EDGE_FAIL_FLASH, after_hit_color=self.EDGE_FAIL,
+                        push_to_iterable=False,
+                    )
+                    for key in fail_anims:
+                        combined_anims[key] = combined_anims.get(key, []) + fail_anims[key]
+                combined_anims[square] = combined_anims.get(square, [])
+                if self.ANIMATE_EXPAND_WHILE_PROPOGATING and cell != self.start_cell:
+                    self.fill_cells([square], self.EXPAND_COLOR)
+                    combined_anims[square].append(square.get_update_ring(self.EXPAND_COLOR))
+                if self.ANIMATE_HIGHLIGHT_EXPANDING:
+                    combined_anims[square].append(ApplyMethod(self.highlight.next_to, self.cell_top(cell), UP, rate_func=rush_from))
+                iterable_anims = [
+                    animation
+                    for anim_set in combined_anims.values()
+                    for animation in anim_set
+                ]
+                if not self.ANIMATE_EXPAND_AT_ONCE:
+                    self.scene.play(Timeline(*iterable_anims), lag_ratio=0)
+                    self.fill_cells(end_squares, self.DISCOVER_COLOR)
+                else:
+                    all_anims.extend(iterable_anims)
+
+            if not self.ANIMATE_EXPAND_AT_ONCE:
+                self.clean_edges(touched)
+
+            if cell != self.start_cell and not self.ANIMATE_EXPAND_WHILE_PROPOGATING:
+                self.scene.play(self.fill_cells([square], self.EXPAND_COLOR, anim=True))
+
+        if anim and self.ANIMATE_DISCOVERY and self.ANIMATE_EXPAND_AT_ONCE:
+            self.scene.play(Timeline(*all_anims), lag_ratio=0)
+            self.clean_edges()
+
+    def vert_path(self):
+        return [self.cell_square(cell) for cell in self.trace.path() or self.core_search.path()]
+
+
 class TestScene(Scene):
 
     def construct(self):
@@ -142,7 +284,7 @@ class TestScene(Scene):
 
         c.search_init('F', 'C')
         c.search()
-        self.play(*c.draw_path_propogation(
+        self.play(Timeline(*c.draw_path_propogation(
             c.vert_path(), YELLOW,
             after_hit=GREEN, vertex_color=PURPLE, push_to_iterable=True
-        ))
+        )))
@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+from big_ol_pile_of_manim_imports import *
+from manim_pathing.algorithms.dijkstra import DijkstraGraph
+from manim_pathing.core import BidirectionalDijkstraSearch, FORWARD, BACKWARD
+from manim_pathing.helpers import *
+
+class BidirectionalDijkstraGraph(DijkstraGraph):
+    """
+    DijkstraGraph grown from both ends at once, the end's frontier following directed edges backwards.
+    Vertices show their distance from whichever end reached them last, kept apart as distance and
+    distance_to_end. The expanded area enclosure only makes sense for a single ball, so it is off.
+    """
+
+    ANIMATE_HIGHLIGHT_EXPANDED = False
+    ANIMATE_MEETING_EDGE = True
+
+    BACKWARD_DISCOVER_COLOR = TEAL
+    BACKWARD_EXPAND_COLOR = BLUE
+    MEETING_COLOR = GOLD
+
+    def search_init(self, start, end):
+        super().search_init(start, end)
+        for vertex in self.all_vertices:
+            vertex.distance_to_end = float('inf')
+        self.end.distance_to_end = 0
+        # Backward predecessors point towards the end.
+        self.successors = defaultdict(lambda: None)
+
+    def make_core_search(self) -> BidirectionalDijkstraSearch:
+        return BidirectionalDijkstraSearch(self.core, self.core_id(self.start), self.core_id(self.end))
+
+    def play_steps(self, steps, anim=True):
+        super().play_steps(steps, anim=anim)
+        if anim and self.ANIMATE_MEETING_EDGE:
+            self.scene.play(*self.draw_meeting())
+
+    def expansion_style(self, direction) -> dict:
+        if direction == FORWARD:
+            return {}
+        return {
+            'predecessors': self.successors,
+            'distance_attr': 'distance_to_end',
+            'discover_color': self.BACKWARD_DISCOVER_COLOR,
+            'expand_color': self.BACKWARD_EXPAND_COLOR,
+        }
+
+    def draw_meeting(self):
+        """Flash the edge the two frontiers met over, along with the vertices either side of it."""
+        path = self.trace.path_events()
+        if not path:
+            return []
+        # The meeting edge is where the path passes from the forward search's half to the backward one's.
+        middle, end = next(
+            ((before.vertex, after.vertex) for before, after in zip(path, path[1:]) if after.other == BACKWARD),
+            (path[0].vertex, path[0].vertex),
+        )
+        middle, end = self.core_vertex(middle), self.core_vertex(end)
+        if middle == end:
+            return [middle.get_update_ring(color=self.MEETING_COLOR)]
+        edge = self[middle, end]
+        self.clean_edge(edge)
+        return [
+            self.grow_edge_color(edge, self.MEETING_COLOR, middle),
+            middle.get_update_ring(color=self.MEETING_COLOR),
+            end.get_update_ring(color=self.MEETING_COLOR),
+        ]
+
+    def sync_from_core(self):
+        forward, backward = self.core_search.sides
+        for vertex_id, vertex_key in enumerate(self.core.keys):
+            vertex = self.vertices[vertex_key]
+            vertex.distance = forward.distances[vertex_id]
+            vertex.distance_to_end = backward.distances[vertex_id]
+            vertex.expanded = forward.expanded[vertex_id] or backward.expanded[vertex_id]
+            if forward.predecessors[vertex_id] != -1:
+                self.predecessors[vertex] = self.core_vertex(forward.predecessors[vertex_id])
+            if backward.predecessors[vertex_id] != -1:
+                self.successors[vertex] = self.core_vertex(backward.predecessors[vertex_id])
+        self.iteration = self.core_search.n_expanded
+
+    def vert_path(self):
+        return [self.core_vertex(vertex_id) for vertex_id in self.trace.path() or self.core_search.path()]
+
+class TestScene(Scene):
+
+    def construct(self):
+        c = BidirectionalDijkstraGraph('small.graph', self)
+        c.after_init()
+        c.draw_vertices()
+        self.play(c.draw_edges())
+        self.play(c.draw_edge_weights())
+
+        c.search_init('F', 'C')
+        c.search()
+        self.play(Timeline(*c.draw_path_propogation(
+            c.vert_path(), YELLOW,
+            after_hit=GREEN, vertex_color=PURPLE, push_to_iterable=True
+        )))
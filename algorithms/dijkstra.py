@@ -1,9 +1,12 @@
-import heapq
 import numpy as np
+from bisect import insort
 from collections import defaultdict
+from typing import List, Tuple
 
 from big_ol_pile_of_manim_imports import *
 from manim_pathing.bases.graph import VisualGraph
+from manim_pathing.bases.grid import VisualGrid
+from manim_pathing.core import DijkstraSearch, GridDijkstraSearch, TraceRecorder, expansions
 from manim_pathing.helpers import *
 
 class DijkstraGraph(VisualGraph):
@@ -21,6 +24,8 @@ class DijkstraGraph(VisualGraph):
     DEFAULT_DISTANCE_STRING = '$\\infty$'
 
     def after_init(self):
+        if self.headless:
+            return
         if self.ANIMATE_ANNOTATE_DISTANCE:
             for vertex in self.all_vertices:
                 vertex.change_text(self.DEFAULT_DISTANCE_STRING, self.scene)
@@ -37,7 +42,7 @@ class DijkstraGraph(VisualGraph):
     def search_init(self, start, end):
         super().search_init(start, end)
 
-        if self.ANIMATE_HIGHLIGHT_EXPANDING:
+        if self.ANIMATE_HIGHLIGHT_EXPANDING and not self.headless:
             self.highlight.next_to(self.start, UP)
             self.scene.add_foreground_mobjects(self.highlight)
             self.scene.play(ShowCreation(self.highlight))
@@ -46,39 +51,109 @@ class DijkstraGraph(VisualGraph):
             vertex.expanded = False
             vertex.distance = float('inf')
 
+        if self.ANIMATE_HIGHLIGHT_EXPANDED and not self.headless:
+            # Expanded vertices for the T_n enclosure, kept as they settle by their index in all_vertices.
+            self.vertex_index = {vertex: index for index, vertex in enumerate(self.all_vertices)}
+            self.vertex_centers = np.array([vertex.get_center() for vertex in self.all_vertices])
+            self.expanded_indices = []
+
         self.predecessors = defaultdict(lambda: None)
         self.start.distance = 0
-        self.expanding: List[Vertex] = [self.start]
-        heapq.heapify(self.expanding)
+        self.core_search = self.make_core_search()
+        self.recorder = TraceRecorder(self.core_search)
+        self.trace = self.recorder.trace
 
-        if self.ANIMATE_ANNOTATE_DISTANCE and self.ANIMATE_CHANGE_DISTANCE_NOT_EXPANDED:
+        if self.ANIMATE_ANNOTATE_DISTANCE and self.ANIMATE_CHANGE_DISTANCE_NOT_EXPANDED and not self.headless:
             self.scene.play(self.start.change_text('$0$', self.scene, anim=True, fade_dir=DOWN))
 
+    def make_core_search(self) -> DijkstraSearch:
+        return DijkstraSearch(self.core, self.core_id(self.start), self.core_id(self.end))
+
     def search(self, anim=True):
-        while not self.end.expanded:
+        if not anim or self.headless:
+            # Nothing to draw. Plain Dijkstra is a prefix of start's shortest path tree, which is cached
+            # across searches, other searches run on the arrays.
+            if type(self.core_search) is DijkstraSearch:
+                self.core_search = self.path_tree(self.start).stopped_at(self.core_id(self.end))
+            else:
+                self.core_search.run()
+            self.sync_from_core()
+            return
+        self.play_steps(self.recorder.steps(), anim=anim)
+
+    def search_step(self, anim=True):
+        self.play_step(self.recorder.step(), anim=anim)
+
+    def lookup(self):
+        """
+        Instead of searching, fill in the start -> end result: the path's predecessors and the distances
+        along it. Enough for vert_path. Answers come from the cached shortest path tree of start, or from
+        the map's all-pairs table while the graph is unchanged and enough sources have been looked up.
+        """
+        start_id, end_id = self.core_id(self.start), self.core_id(self.end)
+        if self.use_all_pairs(start_id):
+            table = self.all_pairs
+            path_ids = table.path(start_id, end_id)
+            distances = [table.distance(start_id, vertex_id) for vertex_id in path_ids]
+        else:
+            tree = self.path_tree(self.start)
+            path_ids = tree.path(end_id)
+            distances = [tree.distances[vertex_id] for vertex_id in path_ids]
+        path = [self.core_vertex(vertex_id) for vertex_id in path_ids]
+        for before, vertex in zip(path, path[1:]):
+            self.predecessors[vertex] = before
+        for vertex, distance in zip(path, distances):
+            vertex.distance = distance
+
+    def use_all_pairs(self, start_id) -> bool:
+        """
+        Whether lookup should read the all-pairs table. It is built only once ALL_PAIRS_MIN_SOURCES trees
+        are cached and the graph has at most ALL_PAIRS_MAX_VERTICES vertices, a single source is cheaper as a tree.
+        """
+        core = self.core
+        if core is not self._map_core:
+            return False
+        if self._all_pairs is not None and self._all_pairs[0] is core:
+            return True
+        if start_id in self._path_trees:
+            return False
+        return len(self._path_trees) >= self.ALL_PAIRS_MIN_SOURCES and core.n_vertices <= self.ALL_PAIRS_MAX_VERTICES
+
+    def play_steps(self, steps, anim=True):
+        """Play each step's trace events in turn, whether from the live search or a recorded trace."""
+        for events in steps:
             self.iteration += 1
-            self.search_step(anim=anim)
+            self.play_step(events, anim=anim)
         if anim:
             self.scene.play(ApplyMethod(self.end.set_fill, self.END_COLOR))
 
-    def search_step(self, anim=True):
-        pop_vertex = None
-        while True:
-            pop_vertex = heapq.heappop(self.expanding)
-            if not pop_vertex.expanded:
-                break
+    def play_step(self, events, anim=True):
+        for pop_id, direction, successes, fail_ids in expansions(events):
+            self.apply_expansion(pop_id, successes, fail_ids, anim=anim, **self.expansion_style(direction))
+
+    def expansion_style(self, direction) -> dict:
+        """Extra apply_expansion arguments for expansions in a search direction."""
+        return {}
+
+    def apply_expansion(
+        self, pop_id, successes, fail_ids, anim=True,
+        predecessors=None, distance_attr='distance', discover_color=None, expand_color=None,
+    ):
+        """Copy one expansion onto the vertices, animating it if asked. successes holds (id, new distance) pairs."""
+        predecessors = self.predecessors if predecessors is None else predecessors
+        discover_color = discover_color or self.DISCOVER_COLOR
+        expand_color = expand_color or self.EXPAND_COLOR
+        pop_vertex = self.core_vertex(pop_id)
         success_verts = []
-        for neighbour, weight in self.neighbours(pop_vertex, with_weights=True):
-            if not neighbour.expanded:
-                if neighbour.distance > pop_vertex.distance + weight:
-                    neighbour.distance = pop_vertex.distance + weight
-                    success_verts.append(neighbour)
-                    self.predecessors[neighbour] = pop_vertex
-                    heapq.heappush(self.expanding, neighbour)
+        for neighbour_id, distance in successes:
+            neighbour = self.core_vertex(neighbour_id)
+            setattr(neighbour, distance_attr, distance)
+            success_verts.append(neighbour)
+            predecessors[neighbour] = pop_vertex
         if self.ANIMATE_DISCOVERY and anim:
             success_anims = self.propogate_color_change(
                 pop_vertex, success_verts, self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
-                end_color=self.DISCOVER_COLOR, on_hit_color=self.EDGE_SUCCESS_FLASH, after_hit_color=self.EDGE_SUCCESS,
+                end_color=discover_color, on_hit_color=self.EDGE_SUCCESS_FLASH, after_hit_color=self.EDGE_SUCCESS,
                 push_to_iterable=False,
             )
             combined_anims = {}
@@ -86,7 +161,7 @@ class DijkstraGraph(VisualGraph):
                 combined_anims[key] = success_anims[key]
             if self.ANIMATE_ALL_EDGE_PROPOGATION:
                 fail_anims = self.propogate_color_change(
-                    pop_vertex, list(filter(lambda x: x not in success_verts, self.neighbours(pop_vertex))), self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+                    pop_vertex, [self.core_vertex(end) for end in fail_ids], self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
                     on_hit_color=self.EDGE_FAIL_FLASH, after_hit_color=self.EDGE_FAIL,
                     push_to_iterable=False,
                 )
@@ -104,19 +179,22 @@ class DijkstraGraph(VisualGraph):
                         ShowCreation(self.tn_text),
                     ])
                 else:
-                    points = np.array(list(map(lambda x: x.get_center(), [pop_vertex] + list(filter(lambda x: x.expanded, self.all_vertices)))))
+                    points = self.vertex_centers[[self.vertex_index[pop_vertex]] + self.expanded_indices]
                     new_enclosing = generate_enclosure_on_points(points)
                     new_enclosing.set_stroke(color=BLUE, width=4 * DEFAULT_STROKE_WIDTH)
                     combined_anims[pop_vertex].append(Transform(self.enclosing, new_enclosing))
 
-            pop_vertex.set_fill(self.EXPAND_COLOR)
+            pop_vertex.set_fill(expand_color)
             combined_anims[pop_vertex].append(pop_vertex.get_update_ring())
             if self.ANIMATE_ANNOTATE_DISTANCE and self.ANIMATE_CHANGE_DISTANCE_NOT_EXPANDED:
                 for end in success_verts:
-                    text_change = after_animation_separate(end.change_text(f'${end.distance}$', self.scene, anim=True, fade_dir=DOWN), combined_anims[end][0])
+                    text_change = after_delay(
+                        end.change_text(f'${getattr(end, distance_attr)}$', self.scene, anim=True, fade_dir=DOWN),
+                        self.arrival_time(pop_vertex, end, self.ANIMATE_PROPOGATE_EDGES_AT_ONCE),
+                    )
                     combined_anims[end].append(text_change)
             if self.ANIMATE_ANNOTATE_DISTANCE and not self.ANIMATE_CHANGE_DISTANCE_NOT_EXPANDED:
-                text_change = pop_vertex.change_text(f'${pop_vertex.distance}$', self.scene, anim=True, fade_dir=DOWN)
+                text_change = pop_vertex.change_text(f'${getattr(pop_vertex, distance_attr)}$', self.scene, anim=True, fade_dir=DOWN)
                 combined_anims[pop_vertex].append(text_change)
             if self.ANIMATE_HIGHLIGHT_EXPANDING:
                 # This isn't expected to be used with EXPAND_AT_ONCE, so we can ignore timings.
@@ -126,12 +204,24 @@ class DijkstraGraph(VisualGraph):
                 for anim_set in combined_anims.values()
                 for animation in anim_set
             ]
-            self.scene.play(*iterable_anims, lag_ratio=0)
+            self.scene.play(Timeline(*iterable_anims), lag_ratio=0)
             for end in success_verts:
-                end.set_fill(self.DISCOVER_COLOR)
+                end.set_fill(discover_color)
             self.clean_edges()
+        if self.ANIMATE_HIGHLIGHT_EXPANDED and not self.headless and not pop_vertex.expanded:
+            insort(self.expanded_indices, self.vertex_index[pop_vertex])
         pop_vertex.expanded = True
 
+    def sync_from_core(self):
+        """Copy the result of a core search back onto the vertices."""
+        for vertex_id, vertex_key in enumerate(self.core.keys):
+            vertex = self.vertices[vertex_key]
+            vertex.distance = self.core_search.distances[vertex_id]
+            vertex.expanded = self.core_search.expanded[vertex_id]
+            if self.core_search.predecessors[vertex_id] != -1:
+                self.predecessors[vertex] = self.core_vertex(self.core_search.predecessors[vertex_id])
+        self.iteration = sum(self.core_search.expanded)
+
     def vert_path(self):
         verts = [self.end]
         current = self.end
@@ -140,6 +230,136 @@ class DijkstraGraph(VisualGraph):
             verts.insert(0, current)
         return verts
 
+class DijkstraGrid(VisualGrid):
+
+    ANIMATE_HIGHLIGHT_EXPANDING = True
+    ANIMATE_DISCOVERY = True
+    ANIMATE_ALL_EDGE_PROPOGATION = True
+    ANIMATE_PROPOGATE_EDGES_AT_ONCE = True
+
+    def after_init(self):
+        if self.headless:
+            return
+        if self.ANIMATE_HIGHLIGHT_EXPANDING:
+            self.highlight = Polygon(
+                (-0.2, 0.2, 0),
+                (0, 0, 0),
+                (0.2, 0.2, 0),
+                (0, 0, 0),
+                color=WHITE,
+            )
+
+    def search_init(self, start, end):
+        super().search_init(start, end)
+
+        if self.ANIMATE_HIGHLIGHT_EXPANDING and not self.headless:
+            self.highlight.next_to(self.cell_top(self.start_cell), UP)
+            self.scene.add_foreground_mobjects(self.highlight)
+            self.scene.play(ShowCreation(self.highlight))
+
+        self.core_search = self.make_core_search()
+        self.recorder = TraceRecorder(self.core_search)
+        self.trace = self.recorder.trace
+
+    def make_core_search(self) -> GridDijkstraSearch:
+        return GridDijkstraSearch(self.map, self.start_cell, self.end_cell, method=self.TRAVERSAL_METHOD)
+
+    def search(self, anim=True):
+        if not anim or self.headless:
+            self.core_search.run()
+            self.iteration = self.core_search.n_expanded
+            return
+        self.play_steps(self.recorder.steps(), anim=anim)
+
+    def search_step(self, anim=True):
+        self.play_step(self.recorder.step(), anim=anim)
+
+    def play_steps(self, steps, anim=True):
+        """Play each step's trace events in turn, whether from the live search or a recorded trace."""
+        for events in steps:
+            self.iteration += 1
+            self.play_step(events, anim=anim)
+        if anim:
+            self.scene.play(self.fill_cells([self.end], self.END_COLOR, anim=True))
+
+    def play_step(self, events, anim=True):
+        if not anim:
+            return
+        for pop_cell, _, successes, fail_cells in expansions(events):
+            self.animate_expansion(pop_cell, [cell for cell, _ in successes], fail_cells)
+
+    def animation_count(self, steps) -> int:
+        """How many animations play_steps plays for the steps given, without building them. Works headless."""
+        # The end fill play_steps finishes with.
+        count = 1
+        for events in steps:
+            for pop_cell, _, successes, fail_cells in expansions(events):
+                count += self.expansion_animation_count(pop_cell, [cell for cell, _ in successes], fail_cells)
+        return count
+
+    def expansion_propogations(self, success_ends, fail_ends) -> List[Tuple[list, dict]]:
+        """The propogations animate_expansion plays from the expanded cell, as (ends, propogate_color_change arguments)."""
+        if not self.ANIMATE_DISCOVERY:
+            return []
+        propogations = [(success_ends, dict(
+            edge_color=self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+            end_color=self.DISCOVER_COLOR, on_hit_color=self.EDGE_SUCCESS_FLASH, after_hit_color=self.EDGE_SUCCESS,
+        ))]
+        if self.ANIMATE_ALL_EDGE_PROPOGATION:
+            propogations.append((fail_ends, dict(
+                edge_color=self.EDGE_DISCOVERY, at_once=self.ANIMATE_PROPOGATE_EDGES_AT_ONCE,
+                on_hit_color=self.EDGE_FAIL_FLASH, after_hit_color=self.EDGE_FAIL,
+            )))
+        return propogations
+
+    def expansion_marks(self, pop_cell) -> List[str]:
+        """The animations animate_expansion plays on the expanded cell itself, by kind."""
+        marks = []
+        if pop_cell != self.start_cell:
+            marks.append('ring')
+        if self.ANIMATE_HIGHLIGHT_EXPANDING:
+            marks.append('highlight')
+        return marks
+
+    def animate_expansion(self, pop_cell, success_cells, fail_cells):
+        pop_square = self.cell_square(pop_cell)
+        success_squares = [self.cell_square(end) for end in success_cells]
+        fail_squares = [self.cell_square(end) for end in fail_cells]
+        combined_anims = {}
+        for ends, kwargs in self.expansion_propogations(success_squares, fail_squares):
+            anims = self.propogate_color_change(pop_square, ends, push_to_iterable=False, **kwargs)
+            for key in anims:
+                combined_anims[key] = combined_anims.get(key, []) + anims[key]
+        combined_anims[pop_square] = combined_anims.get(pop_square, [])
+        for mark in self.expansion_marks(pop_cell):
+            if mark == 'ring':
+                self.fill_cells([pop_square], self.EXPAND_COLOR)
+                combined_anims[pop_square].append(pop_square.get_update_ring(self.EXPAND_COLOR))
+            else:  # 'highlight'
+                combined_anims[pop_square].append(ApplyMethod(self.highlight.next_to, self.cell_top(pop_cell), UP, rate_func=rush_from))
+        iterable_anims = [
+            animation
+            for anim_set in combined_anims.values()
+            for animation in anim_set
+        ]
+        self.scene.play(Timeline(*iterable_anims), lag_ratio=0)
+        self.fill_cells(success_squares, self.DISCOVER_COLOR)
+        self.clean_edges(
+            self[pop_square, end]
+            for end in success_squares + (fail_squares if self.ANIMATE_ALL_EDGE_PROPOGATION else [])
+        )
+
+    def expansion_animation_count(self, pop_cell, success_ends, fail_ends) -> int:
+        """How many animations animate_expansion plays for an expansion, from the same plan, without building them."""
+        count = sum(
+            self.propogation_animation_count(len(ends), **kwargs)
+            for ends, kwargs in self.expansion_propogations(success_ends, fail_ends)
+        )
+        return count + len(self.expansion_marks(pop_cell))
+
+    def vert_path(self):
+        return [self.cell_square(cell) for cell in self.trace.path() or self.core_search.path()]
+
 class TestScene(Scene):
 
     def construct(self):
@@ -151,7 +371,7 @@ class TestScene(Scene):
 
         c.search_init('F', 'C')
         c.search()
-        self.play(*c.draw_path_propogation(
+        self.play(Timeline(*c.draw_path_propogation(
             c.vert_path(), YELLOW,
             after_hit=GREEN, vertex_color=PURPLE, push_to_iterable=True
-        ))
+        )))
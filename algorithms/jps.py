@@ -0,0 +1,79 @@
+import time
+from typing import Dict, Optional
+
+from big_ol_pile_of_manim_imports import *
+from manim_pathing.algorithms.astar import AStarGrid
+from manim_pathing.core import GridJPSSearch
+from manim_pathing.helpers import *
+
+class JPSGrid(AStarGrid):
+    """
+    Jump Point Search. Only jump points are expanded, and the edges animated are
+    the straight (or diagonal) runs between them rather than single steps.
+    """
+
+    TRAVERSAL_METHOD = AStarGrid.OCTAL_NO_CORNERS
+
+    def make_core_search(self) -> GridJPSSearch:
+        assert self.TRAVERSAL_METHOD == self.OCTAL_NO_CORNERS, 'JPS only supports OCTAL_NO_CORNERS.'
+        return GridJPSSearch(self.map, self.start_cell, self.end_cell)
+
+    def _cell_edge_weight(self, cell1: int, cell2: int) -> Optional[float]:
+        # Jump segments join squares along a row, column or diagonal.
+        x1, y1 = divmod(cell1, self.map.width)
+        x2, y2 = divmod(cell2, self.map.width)
+        if cell1 == cell2 or not (x1 == x2 or y1 == y2 or abs(x1 - x2) == abs(y1 - y2)):
+            return None
+        return float(self.dist(self.cell_square(cell1), self.cell_square(cell2)))
+
+    @property
+    def max_length(self):
+        return max(self.map.shape) * self.DIAG_DIST
+
+    def cell_path(self):
+        """Every square on the path, not just the jump points vert_path returns."""
+        return [self.cell_square(cell) for cell in self.core_search.cell_path()]
+
+
+def compare_with_astar(filename, start, end, repeats=3) -> Dict[str, Dict[str, float]]:
+    """
+    Run JPS and plain A* (both OCTAL_NO_CORNERS) headless on the same map and query.
+    `animations` counts what the animated search would play, from the same plan play_steps builds by.
+    """
+    results = {}
+    for name, grid_class in (('astar', AStarGrid), ('jps', JPSGrid)):
+        grid = grid_class(filename, None)
+        for cell in (start, end):
+            if not grid.traversable(cell):
+                raise ValueError(f'{cell} is a wall in {filename}, searches must start and end on open cells.')
+        grid.search_init(start, end)
+        wall_time = float('inf')
+        for _ in range(repeats):
+            began = time.perf_counter()
+            search = grid.make_core_search().run()
+            wall_time = min(wall_time, time.perf_counter() - began)
+        animations = grid.animation_count(grid.recorder.steps())
+        results[name] = {
+            'distance': search.distances[grid.end_cell],
+            'expansions': search.n_expanded,
+            'wall_time': wall_time,
+            'animations': animations,
+        }
+    return results
+
+
+class TestScene(Scene):
+
+    def construct(self):
+        c = JPSGrid('medium.map', self)
+        c.after_init()
+        self.play(*c.draw_vertices())
+
+        c.search_init((1, 23), (6, 2))
+        c.search()
+        path = c.vert_path()
+        for square1, square2 in zip(path[:-1], path[1:]):
+            self.play(Timeline(*c.propogate_color_change(
+                square1, [square2], YELLOW,
+                after_hit_color=GREEN, push_to_iterable=True,
+            )))
@@ -1,3 +1,4 @@
 from manim_pathing.bases.graph.graph import VisualGraph
 from manim_pathing.bases.graph.edge import Edge
-from manim_pathing.bases.graph.vertex import Vertex
+from manim_pathing.bases.graph.layer import EdgeLayer
+from manim_pathing.bases.graph.vertex import Vertex, HeadlessVertex
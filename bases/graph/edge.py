@@ -9,6 +9,9 @@ class Edge:
         'stroke_width': DEFAULT_STROKE_WIDTH * 2,
     }
 
+    # Most spare lines an edge holds on to for later recolours.
+    SPARE_LINES = 3
+
     WEIGHT_CONFIG = {
         'color': WHITE,
     }
@@ -18,10 +21,22 @@ class Edge:
         self.v2 = v2
         self.weight = 1 if weight is None else weight
         self.directed = directed
+        # Assigned by the owning VisualGraph, stable for the lifetime of the edge.
+        self.id = None
         self.line_obj = None
         self.tmp_lines = []
-        self.weight_text = TextMobject('', **self.WEIGHT_CONFIG)
-        self.weight_text.next_to(self.midpoint, UP)
+        # Lines clean() took out of the scene, animations built before it may still use them until played.
+        self.released_lines = []
+        self.spare_lines = []
+        self._weight_text = None
+
+    @property
+    def weight_text(self):
+        # Built on first use, headless graphs never need it.
+        if self._weight_text is None:
+            self._weight_text = TextMobject('', **self.WEIGHT_CONFIG)
+            self._weight_text.next_to(self.midpoint, UP)
+        return self._weight_text
 
     @property
     def length(self):
@@ -46,22 +61,36 @@ class Edge:
             0
         ))
 
+    def _line_ends(self, v1: Vertex, v2: Vertex):
+        return (
+            v1.get_center() +
+            unit_vec(v2.get_center() - v1.get_center()) *
+            v1.radius * 0.99,
+            v2.get_center() +
+            unit_vec(v1.get_center() - v2.get_center()) *
+            v2.radius * 0.99,
+        )
+
     def _gen_line_with_args(self, v1: Vertex, v2: Vertex, **kwargs) -> Line:
         config = dict(**self.CONFIG)
         config.update(kwargs)
-        return Line(
-            Point(
-                v1.get_center() +
-                unit_vec(v2.get_center() - v1.get_center()) *
-                v1.radius * 0.99
-            ),
-            Point(
-                v2.get_center() +
-                unit_vec(v1.get_center() - v2.get_center()) *
-                v2.radius * 0.99
-            ),
-            **config,
-        )
+        start, end = self._line_ends(v1, v2)
+        return Line(Point(start), Point(end), **config)
+
+    def _overlay_line(self, v1: Vertex, v2: Vertex, color) -> Line:
+        """A line v1 -> v2 in color, a spare one moved into place if there is one."""
+        if not self.spare_lines:
+            return self._gen_line_with_args(v1, v2, color=color)
+        line = self.spare_lines.pop()
+        line.put_start_and_end_on(*self._line_ends(v1, v2))
+        line.set_stroke(color, opacity=1)
+        return line
+
+    def _copy_line(self, line: Line) -> Line:
+        """A copy of line, a spare one made to match it if there is one."""
+        if not self.spare_lines:
+            return line.copy()
+        return self.spare_lines.pop().become(line)
 
     def draw(self, direction='f', **kwargs) -> Animation:
         if direction == 'f':
@@ -85,19 +114,19 @@ class Edge:
         if from_v is None:
             original = self.line_obj if not self.tmp_lines else self.tmp_lines[-1]
             if from_color is not None:
-                self.tmp_lines.append(original.copy())
+                self.tmp_lines.append(self._copy_line(original))
                 self.tmp_lines[-1].set_color(from_color)
                 original = self.tmp_lines[-1]
-            self.tmp_lines.append(original.copy())
+            self.tmp_lines.append(self._copy_line(original))
             self.tmp_lines[-1].set_color(color)
-            animation = Transform(original, self.tmp_lines[-1], **kwargs)
             if class_mode:
                 return SuccessiveTransform, [self.tmp_lines[-2], self.tmp_lines[-1]], kwargs
+            animation = Transform(original, self.tmp_lines[-1], **kwargs)
         else:
             if from_v == self.v1:
-                self.tmp_lines.append(self._gen_line_with_args(self.v1, self.v2, color=color))
+                self.tmp_lines.append(self._overlay_line(self.v1, self.v2, color))
             elif from_v == self.v2:
-                self.tmp_lines.append(self._gen_line_with_args(self.v2, self.v1, color=color))
+                self.tmp_lines.append(self._overlay_line(self.v2, self.v1, color))
             else:
                 raise ValueError('from_v must be an adjacent vertex.')
             animation = ShowCreation(self.tmp_lines[-1], **kwargs)
@@ -110,6 +139,20 @@ class Edge:
         scene.remove(self.line_obj)
         if self.tmp_lines:
             scene.remove(*self.tmp_lines)
+            self.released_lines.append(self.line_obj)
+            self.released_lines.extend(self.tmp_lines[:-1])
             self.line_obj = self.tmp_lines[-1]
             self.tmp_lines = []
         scene.add(self.line_obj)
+
+    def recycle(self, scene: Scene):
+        """
+        Make the lines clean() released spare, to be recoloured in place by later change_color calls.
+        Only call once every animation built before the last clean() has been played.
+        """
+        if not self.released_lines:
+            return
+        scene.remove(*self.released_lines)
+        room = self.SPARE_LINES - len(self.spare_lines)
+        self.spare_lines.extend(self.released_lines[:room])
+        self.released_lines = []
@@ -1,22 +1,35 @@
-import os
-import re
-from collections import defaultdict
-from typing import Dict, DefaultDict, Optional, Union, Tuple, List
+import heapq
+from collections import OrderedDict, defaultdict
+from typing import Dict, DefaultDict, Optional, Union, Tuple, List, Iterable
 
 from big_ol_pile_of_manim_imports import *
 from manim_pathing.bases.graph.edge import Edge
-from manim_pathing.bases.graph.vertex import Vertex
+from manim_pathing.bases.graph.layer import EdgeLayer, DrawEdges, GrowEdgeColor, FROM_START, FROM_END
+from manim_pathing.bases.graph.vertex import Vertex, HeadlessVertex
+from manim_pathing.core import AllPairs, DijkstraSearch, GraphCore, MAPS, Trace, TraceWriter, TraceFile
 from manim_pathing.helpers import *
 
 class VisualGraph:
 
     VERTEX_DEFAULTS = {}
 
-    vertex_matcher = re.compile(r'(?P<key>\S+), \((?P<x>\S+), (?P<y>\S+)\)')
-    edge_matcher = re.compile(r'(?P<key1>\S+) (?P<direction>(>|<|-))(?P<weight>((\S+)|-|>|<))(>|<|-) (?P<key2>\S+)')
+    MAP_REGISTRY = MAPS
 
     PROPOGATION_SPEED = 1
 
+    # Draw every edge into one EdgeLayer rather than a line each, for graphs with thousands of edges.
+    EDGE_LAYER = False
+
+    # Memory path_tree's cache may hold, in bytes. Each tree keeps several lists as long as the graph,
+    # measured at about PATH_TREE_BYTES_PER_VERTEX per vertex, and the latest tree is always kept.
+    PATH_TREE_CACHE_BYTES = 64 * 2 ** 20
+    PATH_TREE_BYTES_PER_VERTEX = 80
+
+    # DijkstraGraph.lookup builds the O(V^2) all-pairs table once this many sources have path trees, and
+    # only on graphs with at most ALL_PAIRS_MAX_VERTICES vertices.
+    ALL_PAIRS_MIN_SOURCES = 8
+    ALL_PAIRS_MAX_VERTICES = 2000
+
     START_COLOR = GREEN
     END_COLOR = RED
 
@@ -31,75 +44,249 @@ class VisualGraph:
 
     CURRENT_VERTS = '#F4A460'
 
-    def __init__(self, filename, scene: Scene, **kwargs):
+    def __init__(self, filename, scene: Optional[Scene], **kwargs):
+        """Without a scene the graph is headless, searches still run but nothing is drawn or built to draw."""
         defaults = self.VERTEX_DEFAULTS
         defaults.update(kwargs)
-        vertex_info = []
-        edge_info = []
-        for line in open(os.path.join('manim_pathing/maps/', filename), 'r').readlines():
-            vmatch = self.vertex_matcher.match(line.strip())
-            ematch = self.edge_matcher.match(line.strip())
-            if vmatch is not None:
-                info = vmatch.groupdict()
-                vertex_info.append((info['key'], (float(info['x']), float(info['y']), 0)))
-            if ematch is not None:
-                info = ematch.groupdict()
-                kwargs = {}
-                if info['direction'] in '><':
-                    kwargs['directed'] = True
-                if info['weight'].isnumeric():
-                    kwargs['weight'] = float(info['weight'])
-                    if int(kwargs['weight']) == kwargs['weight']:
-                        kwargs['weight'] = int(kwargs['weight'])
-                if info['direction'] == '<':
-                    args = [info['key2'], info['key1']]
-                else:
-                    args = [info['key1'], info['key2']]
-                edge_info.append((args, kwargs))
+        map_core = self.MAP_REGISTRY.load_graph(filename)
+        self.filename = filename
         self.vertices: Dict[str, Vertex] = {}
-        self.edges: DefaultDict[Vertex, DefaultDict[Vertex, Optional[Edge]]] = defaultdict(lambda: defaultdict(lambda: None))
-
-        for vertex in vertex_info:
-            vobj = Vertex(*vertex, **defaults)
-            self.vertices[vobj.key] = vobj
-        for args, kwargs in edge_info:
-            args[0] = self[args[0]]
-            args[1] = self[args[1]]
-            edge = Edge(*args, **kwargs)
-            self[args[0:2]] = edge
-            if not kwargs.get('directed', False):
-                self[args[1::-1]] = edge
-
-        self.max_length = max(edge.length for edge in self.all_edges)
-        self.scene: Scene = scene
+        # Edges are stored once, by id. adjacency[v1][v2] holds the id of the edge travelling v1 -> v2,
+        # reverse_adjacency[v2][v1] the same id, so both out and in neighbours cost O(deg).
+        self.edges: Dict[int, Edge] = {}
+        self.adjacency: DefaultDict[Vertex, Dict[Vertex, int]] = defaultdict(dict)
+        self.reverse_adjacency: DefaultDict[Vertex, Dict[Vertex, int]] = defaultdict(dict)
+        self._next_edge_id = 0
+        # Position of each vertex key in self.vertices, so neighbours come out in vertex order.
+        self._vertex_rank: Dict[str, int] = {}
+        self._next_vertex_rank = 0
+        # Max-heap of (-length, edge id), stale ids are dropped lazily in max_length.
+        self._lengths: List[Tuple[float, int]] = []
+        self._core: Optional[GraphCore] = None
+        self._map_core: Optional[GraphCore] = None
+        # (core, table), the table is rebuilt once core no longer matches.
+        self._all_pairs: Optional[Tuple[GraphCore, AllPairs]] = None
+        # Finished Dijkstra searches by source id, least recently used first. Ids stay valid until a vertex
+        # is added or removed, which empties the cache, so path_tree_index is the core index they refer to.
+        self._path_trees: 'OrderedDict[int, DijkstraSearch]' = OrderedDict()
+        self._path_tree_index: Dict[str, int] = {}
+        # Built by draw_edges when EDGE_LAYER is set, edges then have no lines of their own.
+        self.edge_layer: Optional[EdgeLayer] = None
+
+        for vertex_id in map_core.input_ids.tolist():
+            x, y = map_core.coords[vertex_id].tolist()
+            if scene is None:
+                self.add_vertex(HeadlessVertex(map_core.keys[vertex_id], (x, y, 0)))
+            else:
+                self.add_vertex(Vertex(map_core.keys[vertex_id], (x, y, 0), **defaults))
+        for v1, v2, weight, directed in zip(
+            map_core.edge_src.tolist(), map_core.edge_dst.tolist(),
+            map_core.edge_weight.tolist(), map_core.edge_directed.tolist(),
+        ):
+            self.add_edge(map_core.keys[v1], map_core.keys[v2], weight=weight, directed=directed)
+        if len(self.edges) == map_core.n_edges:
+            # Nothing was overwritten while loading, so the compiled map already is our core.
+            self._core = self._map_core = map_core
+
+        self.scene: Optional[Scene] = scene
 
     # Properties and method overrides
+    @property
+    def headless(self) -> bool:
+        return self.scene is None
+
     @property
     def all_vertices(self):
         return self.vertices.values()
 
     @property
     def all_edges(self):
-        for v1 in self.all_vertices:
-            for v2 in self.all_vertices:
-                if v1.key < v2.key:
-                    if self[v1, v2]:
-                        yield self[v1, v2]
+        return self.edges.values()
+
+    @property
+    def max_length(self):
+        while self._lengths and self._lengths[0][1] not in self.edges:
+            heapq.heappop(self._lengths)
+        return -self._lengths[0][0] if self._lengths else 0
+
+    @property
+    def core(self) -> GraphCore:
+        """Array backed copy of the current topology, rebuilt lazily after any change."""
+        if self._core is None:
+            keys = list(self.vertices)
+            index = {key: i for i, key in enumerate(keys)}
+            edges = list(self.all_edges)
+            self._core = GraphCore(
+                keys,
+                [self.vertices[key].pos for key in keys],
+                [index[edge.v1.key] for edge in edges],
+                [index[edge.v2.key] for edge in edges],
+                [edge.weight for edge in edges],
+                [edge.directed for edge in edges],
+            )
+        return self._core
+
+    @property
+    def all_pairs(self) -> AllPairs:
+        """
+        Shortest paths between every pair of vertices. While the graph is still exactly its map file the
+        table is cached on disk alongside the compiled map, after any change it is rebuilt in memory.
+        """
+        core = self.core
+        if self._all_pairs is None or self._all_pairs[0] is not core:
+            if core is self._map_core:
+                table = self.MAP_REGISTRY.load_all_pairs(self.filename)
+            else:
+                table = AllPairs.from_core(core)
+            self._all_pairs = (core, table)
+        return self._all_pairs[1]
+
+    def path_tree(self, source) -> DijkstraSearch:
+        """
+        Dijkstra from source, run over the whole graph. Kept until an edge change could alter it,
+        so asking again for the same source is free.
+        """
+        source_id = self.core_id(source)
+        tree = self._path_trees.get(source_id)
+        if tree is not None:
+            self._path_trees.move_to_end(source_id)
+            return tree
+        if not self._path_trees:
+            self._path_tree_index = self.core.index
+        tree = self._path_trees[source_id] = DijkstraSearch(self.core, source_id).run()
+        max_trees = max(1, self.PATH_TREE_CACHE_BYTES // (self.PATH_TREE_BYTES_PER_VERTEX * self.core.n_vertices))
+        while len(self._path_trees) > max_trees:
+            self._path_trees.popitem(last=False)
+        return tree
+
+    def _invalidate_path_trees(self, edge: Edge, added: bool):
+        """
+        Drop the trees an added or removed edge could change. A new arc matters if it ties or beats the
+        distance its end already has (ties can change which predecessor wins), a removed one only if the tree uses it.
+        """
+        if not self._path_trees:
+            return
+        index = self._path_tree_index
+        arcs = [(edge.v1, edge.v2)] if edge.directed else [(edge.v1, edge.v2), (edge.v2, edge.v1)]
+        for source_id, tree in list(self._path_trees.items()):
+            for start, end in arcs:
+                start_id, end_id = index[start.key], index[end.key]
+                if added:
+                    distance = tree.distances[start_id]
+                    stale = distance != float('inf') and distance + edge.weight <= tree.distances[end_id]
+                else:
+                    stale = tree.predecessors[end_id] == start_id
+                if stale:
+                    del self._path_trees[source_id]
+                    break
+
+    def core_vertex(self, vertex_id: int) -> Vertex:
+        return self.vertices[self.core.keys[vertex_id]]
+
+    def core_id(self, vertex: Union[Vertex, str]) -> int:
+        return self.core.index[self[vertex].key]
 
     def __getitem__(self, key) -> Union[Vertex, Optional[Edge]]:
         """Get vertex/edge by key/vertex"""
         if isinstance(key, list) or isinstance(key, tuple):
-            return self.edges[self[key[0]]][self[key[1]]]
-        if isinstance(key, Vertex):
+            edge_id = self.adjacency[self[key[0]]].get(self[key[1]])
+            return None if edge_id is None else self.edges[edge_id]
+        if isinstance(key, (Vertex, HeadlessVertex)):
             return key
         return self.vertices[key]
 
     def __setitem__(self, key, value):
-        """Set vertex/edge by key/vertex"""
+        """Set vertex/edge by key/vertex. Setting an edge to None removes it."""
         if isinstance(key, list) or isinstance(key, tuple):
-            self.edges[self[key[0]]][self[key[1]]] = value
+            if value is not None:
+                # add_edge replaces any edge already there itself.
+                self.add_edge(key[0], key[1], edge=value)
+            elif self[key] is not None:
+                self.remove_edge(key[0], key[1])
         else:
-            self.vertices[key] = value
+            if key in self.vertices:
+                self.remove_vertex(key)
+            if value is not None:
+                self.add_vertex(value)
+
+    # Topology changes
+    def add_vertex(self, vertex: Union[Vertex, HeadlessVertex]) -> Vertex:
+        if vertex.key not in self._vertex_rank:
+            self._vertex_rank[vertex.key] = self._next_vertex_rank
+            self._next_vertex_rank += 1
+        self.vertices[vertex.key] = vertex
+        self._core = None
+        self._path_trees.clear()
+        return vertex
+
+    def remove_vertex(self, vertex: Union[Vertex, str]):
+        """Remove a vertex and every edge touching it."""
+        vertex = self[vertex]
+        for end in list(self.adjacency[vertex]):
+            self.remove_edge(vertex, end)
+        for end in list(self.reverse_adjacency[vertex]):
+            self.remove_edge(end, vertex)
+        self.adjacency.pop(vertex, None)
+        self.reverse_adjacency.pop(vertex, None)
+        del self.vertices[vertex.key]
+        del self._vertex_rank[vertex.key]
+        self._core = None
+        self._path_trees.clear()
+
+    def add_edge(self, v1, v2, weight=None, directed=False, edge: Optional[Edge] = None) -> Edge:
+        """Add an edge v1 -> v2 (both ways unless directed), replacing any edge already there."""
+        v1, v2 = self[v1], self[v2]
+        if edge is None:
+            edge = Edge(v1, v2, weight=weight, directed=directed)
+        replaced = self[v1, v2]
+        if replaced is None and not edge.directed:
+            replaced = self[v2, v1]
+        if self.edge_layer is not None and replaced is not None:
+            # The replacement is the same edge on screen, its slot carries on as far drawn and coloured.
+            replaced_look = self.edge_layer.drawn[replaced.id], self.edge_layer.rgbs[replaced.id].copy()
+        if self[v1, v2] is not None:
+            self.remove_edge(v1, v2)
+        if not edge.directed and self[v2, v1] is not None:
+            self.remove_edge(v2, v1)
+        edge.id = self._next_edge_id
+        self._next_edge_id += 1
+        self.edges[edge.id] = edge
+        self.adjacency[v1][v2] = edge.id
+        self.reverse_adjacency[v2][v1] = edge.id
+        if not edge.directed:
+            self.adjacency[v2][v1] = edge.id
+            self.reverse_adjacency[v1][v2] = edge.id
+        heapq.heappush(self._lengths, (-edge.length, edge.id))
+        if self.edge_layer is not None:
+            self.place_edges([edge])
+            if replaced is not None:
+                drawn, rgb = replaced_look
+                self.edge_layer.set_drawn([edge.id], drawn)
+                self.edge_layer.set_colors([edge.id], rgb)
+                self.edge_layer.refresh()
+        self._core = None
+        self._invalidate_path_trees(edge, added=True)
+        return edge
+
+    def remove_edge(self, v1, v2) -> Optional[Edge]:
+        """Remove the edge travelling v1 -> v2, along with its reverse if undirected."""
+        v1, v2 = self[v1], self[v2]
+        edge_id = self.adjacency[v1].pop(v2, None)
+        if edge_id is None:
+            return None
+        del self.reverse_adjacency[v2][v1]
+        edge = self.edges.pop(edge_id)
+        if not edge.directed:
+            del self.adjacency[v2][v1]
+            del self.reverse_adjacency[v1][v2]
+        if self.edge_layer is not None:
+            # The slot stays behind, undrawn, so the edge leaves the screen with it.
+            self.edge_layer.set_drawn([edge.id], 0)
+            self.edge_layer.set_overlay([edge.id, edge.id], [FROM_START, FROM_END], BLACK, 0)
+            self.edge_layer.refresh()
+        self._core = None
+        self._invalidate_path_trees(edge, added=False)
+        return edge
 
     # Generic Animation
     def draw_vertices(self, play=True, **kwargs) -> Tuple[Animation]:
@@ -113,13 +300,32 @@ class VisualGraph:
         return anim1, anim2
 
     def draw_edges(self, **kwargs) -> Animation:
-        return AnimationGroup(*(e.draw(**kwargs) for e in self.all_edges))
+        if not self.EDGE_LAYER:
+            return AnimationGroup(*(e.draw(**kwargs) for e in self.all_edges))
+        config = dict(Edge.CONFIG)
+        config.update(kwargs)
+        self.edge_layer = EdgeLayer(**config)
+        self.place_edges(self.all_edges)
+        return DrawEdges(self.edge_layer, list(self.edges))
+
+    def place_edges(self, edges: Iterable[Edge]):
+        """Move the edges' segments in the edge layer to where their vertices are."""
+        edges = list(edges)
+        ends = [edge._line_ends(edge.v1, edge.v2) for edge in edges]
+        self.edge_layer.set_segments(
+            [edge.id for edge in edges],
+            [start for start, _ in ends],
+            [end for _, end in ends],
+        )
 
     def draw_edge_weights(self, **kwargs) -> Animation:
         return AnimationGroup(*(e.draw_weight(**kwargs) for e in self.all_edges))
 
     def destroy(self, anim_class=Uncreate, **kwargs) -> Animation:
-        anim1 = [anim_class(e.line_obj, **kwargs) for e in self.all_edges]
+        if self.edge_layer is not None:
+            anim1 = [anim_class(self.edge_layer, **kwargs)]
+        else:
+            anim1 = [anim_class(e.line_obj, **kwargs) for e in self.all_edges]
         anim2 = [anim_class(e.weight_text, **kwargs) for e in self.all_edges]
         anim3 = [anim_class(v, **kwargs) for v in self.all_vertices]
         anim4 = [anim_class(v.text, **kwargs) for v in self.all_vertices]
@@ -131,6 +337,8 @@ class VisualGraph:
         self.iteration = 0
         self.start = self[start]
         self.end = self[end]
+        if self.headless:
+            return
 
         self.start.set_fill(self.START_COLOR)
         self.end.set_fill(self.END_COLOR)
@@ -139,30 +347,65 @@ class VisualGraph:
             self.end.get_update_ring(),
         )
 
+    # Traces, searches make self.recorder in search_init and play trace steps with play_steps.
+    def record(self, filename: Optional[str] = None) -> Trace:
+        """
+        Run the search set up by search_init to the end without drawing anything, returning its trace.
+        Given a filename, events are streamed to that file as the search runs and it is read back instead.
+        """
+        if filename is None:
+            self.play_steps(self.recorder.steps(), anim=False)
+            return self.recorder.trace
+        with TraceWriter(filename) as writer:
+            self.recorder.trace = writer
+            self.play_steps(self.recorder.steps(), anim=False)
+        self.trace = TraceFile(filename)
+        return self.trace
+
+    def replay(self, trace: Trace, anim=True):
+        """Play back a trace of the search set up by search_init, instead of searching again."""
+        self.trace = trace
+        self.play_steps(trace.steps(), anim=anim and not self.headless)
+
     # Computation helpers
     def neighbours(self, vertex: Union[Vertex, str], with_weights=False):
         vertex = self[vertex] # If key, make vert
         if not with_weights:
-            return [
-                end
-                for end in self.all_vertices
-                if self[vertex, end] is not None
-            ]
+            return self._in_vertex_order(self.adjacency[vertex])
+        return [
+            (end, self.edges[self.adjacency[vertex][end]].weight)
+            for end in self._in_vertex_order(self.adjacency[vertex])
+        ]
+
+    def reverse_neighbours(self, vertex: Union[Vertex, str], with_weights=False):
+        """Vertices with an edge travelling into vertex."""
+        vertex = self[vertex]
+        if not with_weights:
+            return self._in_vertex_order(self.reverse_adjacency[vertex])
         return [
-            (end, self[vertex, end].weight)
-            for end in self.all_vertices
-            if self[vertex, end] is not None
+            (start, self.edges[self.reverse_adjacency[vertex][start]].weight)
+            for start in self._in_vertex_order(self.reverse_adjacency[vertex])
         ]
 
+    def _in_vertex_order(self, vertices: Iterable[Vertex]) -> List[Vertex]:
+        """Sorted as self.vertices lists them, which adjacency (in edge insertion order) is not."""
+        return sorted(vertices, key=lambda vertex: self._vertex_rank[vertex.key])
+
     # Pathfinding/General Propogation Animations - Fun part
     def propogate_color_change(
         self, start, ends, edge_color,
         at_once=True, on_hit_color=None, after_hit_color=None, end_color=None,
-        end_texts=None, push_to_iterable=False, **edge_kwargs
+        end_texts=None, push_to_iterable=False, delay=0, **edge_kwargs
     ):
+        """
+        Everything is held back by delay seconds, so many calls can be scheduled against one clock. With an
+        edge layer every edge of the call is recoloured by one GrowEdgeColor and one RecolorLayer, kept
+        under start, so only what happens at each end is listed under it.
+        """
         if not ends:
             return [] if push_to_iterable else {}
-        edges = [self[start, end] for end in ends]
+        # Directed edges may be travelled backwards, by searches growing from the end.
+        edges = [self[start, end] or self[end, start] for end in ends]
         assert None not in edges, "Disconnected vertex in ends."
 
         # Map vertices to animations
@@ -171,8 +414,8 @@ class VisualGraph:
         store_on_hit_color = {}
         store_after_hit_color = {}
         for end, edge in zip(ends, edges):
-            edge.clean(self.scene)
-            store_old_color[edge] = edge.line_obj.get_color()
+            self.clean_edge(edge)
+            store_old_color[edge] = self.edge_color(edge)
             if not on_hit_color:
                 store_on_hit_color[edge] = edge_color
             else:
@@ -186,51 +429,57 @@ class VisualGraph:
                 if after_hit_color == 'previous'
                 else after_hit_color
             )
-            # Original line color change
-            extension_dict[end] = [edge.change_color(
-                edge_color,
-                from_v=start,
-                anim=True,
-                run_time=self.PROPOGATION_SPEED * (
-                    1 if at_once else edge.length / self.max_length
-                ),
-                **edge_kwargs,
-            )]
+            arrival = delay + self.propogation_time(edge, at_once)
+            extension_dict[end] = []
+            if self.edge_layer is None:
+                # Original line color change
+                line_change = self.grow_edge_color(
+                    edge,
+                    edge_color,
+                    start,
+                    run_time=self.propogation_time(edge, at_once),
+                    **edge_kwargs,
+                )
+                extension_dict[end].append(after_delay(line_change, delay) if delay else line_change)
             # next step occurs when the edge propogation hits end.
             next_step = []
             if end_color:
-                next_step.append(after_animation_separate(
-                    end.get_update_ring(color=end_color),
-                    *extension_dict[end],
-                ))
+                next_step.append(after_delay(end.get_update_ring(color=end_color), arrival))
             if end_color:
                 # Change end vertex color
-                next_step.append(after_animation_separate(
-                    ApplyMethod(end.set_fill, end_color),
-                    *extension_dict[end],
-                ))
+                next_step.append(after_delay(ApplyMethod(end.set_fill, end_color), arrival))
             if end_texts:
-                next_step.append(after_animation_separate(
-                    end.change_text(end_texts[end], anim=True, fade_dir=DOWN),
-                    *extension_dict[end],
+                next_step.append(after_delay(end.change_text(end_texts[end], anim=True, fade_dir=DOWN), arrival))
+            if self.edge_layer is None:
+                # Edge on hit animations - This isn't the first time, so use successive animations.
+                next_step.append(after_delay(
+                    self.fade_edge_color(
+                        edge,
+                        store_after_hit_color[edge] or edge_color,
+                        store_on_hit_color[edge],
+                        rate_func=rush_into,
+                    ),
+                    arrival,
                 ))
-            # Edge on hit animations - This isn't the first time, so use successive animations.
-            anim_cls, args, kwargs, = edge.change_color(
-                store_after_hit_color[edge] or edge_color,
-                from_color=store_on_hit_color[edge],
-                anim=True,
-                class_mode=True,
-            )
-            kwargs.update({'rate_func': rush_into})
-            next_step.append(after_animation_from_succession(
-                anim_cls,
-                args,
-                kwargs,
-                *extension_dict[end],
-            ))
 
             extension_dict[end].extend(next_step)
 
+        if self.edge_layer is not None:
+            ids = [edge.id for edge in edges]
+            run_times = np.array([self.propogation_time(edge, at_once) for edge in edges])
+            extension_dict[start] = extension_dict.get(start, []) + [
+                GrowEdgeColor(
+                    self.edge_layer, ids, edge_color, sides=[self.edge_side(edge, start) for edge in edges],
+                    delays=delay, durations=run_times, **edge_kwargs,
+                ),
+                RecolorLayer(
+                    self.edge_layer, ids,
+                    np.array([as_rgb(store_after_hit_color[edge] or edge_color) for edge in edges]),
+                    from_color=np.array([as_rgb(store_on_hit_color[edge]) for edge in edges]),
+                    delays=delay + run_times, rate_func=rush_into,
+                ),
+            ]
+
         if push_to_iterable:
             anims = [
                 anim
@@ -252,74 +501,55 @@ class VisualGraph:
         for child, parent in predecessor_map.items():
             children[parent].append(child)
 
-        # BFS search
-        animations = {}
-        timing_animation = {}
-        timing_animation[start] = None
-        vertices = [start, ]
+        # Schedule every vertex up front, in one BFS over the tree: propogation reaches a child when the
+        # edge from its parent finishes, failing edges leave a vertex as propogation reaches it.
+        arrivals = self.propogation_schedule(start, children, at_once)
+
+        # Failing edges are found from both their ends, only the end propogation reaches first (ties to the
+        # smaller key) animates one, and only if both ends are reached.
+        tree_edges = {(parent, child) for child, parent in predecessor_map.items()}
+        failing = {
+            vertex: [
+                neighbour
+                for neighbour in self.neighbours(vertex)
+                if (vertex, neighbour) not in tree_edges and (neighbour, vertex) not in tree_edges # Make sure we don't back propogate.
+            ]
+            for vertex in arrivals
+        } if include_failing_edges else {}
 
-        # Handle failures after to ensure no collisions can occur
-        failures = defaultdict(lambda: defaultdict(lambda: None))
-        while vertices:
-            for vertex in vertices:
-                success_anims = self.propogate_color_change(
+        animations = {}
+        for vertex, arrival in arrivals.items():
+            success_anims = self.propogate_color_change(
+                vertex,
+                children[vertex],
+                edge_color,
+                at_once=at_once,
+                on_hit_color=on_hit_success,
+                after_hit_color=after_hit_success,
+                end_color=vertex_color,
+                end_texts=vertex_texts,
+                rate_func=linear,
+                delay=arrival,
+            )
+            for key in success_anims:
+                animations[key] = animations.get(key, []) + success_anims[key]
+            if include_failing_edges:
+                failure_anims = self.propogate_color_change(
                     vertex,
-                    children[vertex],
+                    [
+                        dest
+                        for dest in failing[vertex]
+                        if failing.get(dest) and (arrival, vertex.key) < (arrivals[dest], dest.key)
+                    ],
                     edge_color,
                     at_once=at_once,
-                    on_hit_color=on_hit_success,
-                    after_hit_color=after_hit_success,
-                    end_color=vertex_color,
-                    end_texts=vertex_texts,
+                    on_hit_color=on_hit_fail,
+                    after_hit_color=after_hit_fail,
                     rate_func=linear,
+                    delay=arrival,
                 )
-                for key in success_anims:
-                    base_anims = animations.get(key, [])
-                    timing_animation[key] = success_anims[key][0]
-                    wait_for = timing_animation[vertex]
-                    animations[key] = (
-                        base_anims + [
-                            after_animation_separate(anim, wait_for) if wait_for else anim
-                            for anim in success_anims[key]
-                        ]
-                    )
-                if include_failing_edges:
-                    failure_anims = self.propogate_color_change(
-                        vertex,
-                        [
-                            neighbour
-                            for neighbour in self.neighbours(vertex)
-                            if neighbour not in children[vertex] and vertex not in children[neighbour] # Make sure we don't back propogate.
-                        ],
-                        edge_color,
-                        at_once=at_once,
-                        on_hit_color=on_hit_fail,
-                        after_hit_color=after_hit_fail,
-                        rate_func=linear,
-                    )
-                    for key in failure_anims:
-                        failures[vertex][key] = failure_anims[key]
-            vertices = [
-                child
-                for vertex in vertices
-                for child in children[vertex]
-            ]
-
-        for source in failures.keys():
-            for dest in failures.keys():
-                if failures[source][dest]:
-                    # Failures will go both ways. Which occurs first? Only use that one.
-                    source_time = timing_animation[source].get_run_time() if timing_animation[source] else 0
-                    dest_time = timing_animation[dest].get_run_time() if timing_animation[dest] else 0
-                    if source_time < dest_time or (source_time == dest_time and source.key < dest.key):  # Make sure we always pick 1.
-                        base_anims = animations.get(dest, [])
-                        wait_for = timing_animation[source]
-                        animations[dest] = (
-                            base_anims + [
-                                after_animation_separate(anim, wait_for) if wait_for else anim
-                                for anim in failures[source][dest]
-                            ]
-                        )
+                for key in failure_anims:
+                    animations[key] = animations.get(key, []) + failure_anims[key]
 
         if push_to_iterable:
             anims = [
@@ -330,6 +560,23 @@ class VisualGraph:
             return anims
         return animations
 
+    def propogation_time(self, edge: Edge, at_once=True) -> float:
+        return self.PROPOGATION_SPEED * (1 if at_once else edge.length / self.max_length)
+
+    def propogation_schedule(self, start, children, at_once=True) -> Dict[Vertex, float]:
+        """Time propogation from start reaches each vertex of the tree given by children, in BFS order."""
+        arrivals = {start: 0}
+        vertices = [start]
+        while vertices:
+            next_vertices = []
+            for vertex in vertices:
+                for child in children[vertex]:
+                    edge = self[vertex, child] or self[child, vertex]
+                    arrivals[child] = arrivals[vertex] + self.propogation_time(edge, at_once)
+                    next_vertices.append(child)
+            vertices = next_vertices
+        return arrivals
+
     def draw_path_propogation(
         self, verts: List[Vertex], edge_color, on_hit=None, after_hit=None,
         vertex_color=None, vertex_texts=None, push_to_iterable=False
@@ -349,9 +596,47 @@ class VisualGraph:
             *(v.text for v in self.all_vertices),
         )
 
+    def edge_side(self, edge: Edge, from_v: Vertex) -> int:
+        """FROM_START or FROM_END, the side of the edge from_v is on in an edge layer."""
+        if from_v not in (edge.v1, edge.v2):
+            raise ValueError('from_v must be an adjacent vertex.')
+        return FROM_START if from_v == edge.v1 else FROM_END
+
+    def arrival_time(self, start, end, at_once=True) -> float:
+        """How long propogate_color_change from start takes to reach end."""
+        return self.propogation_time(self[start, end] or self[end, start], at_once)
+
+    def edge_color(self, edge: Edge):
+        if self.edge_layer is not None:
+            return self.edge_layer.slot_color(edge.id)
+        return edge.line_obj.get_color()
+
+    def grow_edge_color(self, edge: Edge, color, from_v: Vertex, **kwargs) -> Animation:
+        """Recolour the edge by growing color along it from its end at from_v."""
+        if self.edge_layer is None:
+            return edge.change_color(color, from_v=from_v, anim=True, **kwargs)
+        return GrowEdgeColor(self.edge_layer, [edge.id], color, sides=self.edge_side(edge, from_v), **kwargs)
+
+    def fade_edge_color(self, edge: Edge, color, from_color, **kwargs) -> Animation:
+        """Fade the whole edge from from_color to color, hidden until it starts."""
+        if self.edge_layer is None:
+            anim_cls, args, anim_kwargs = edge.change_color(color, from_color=from_color, anim=True, class_mode=True)
+            anim_kwargs.update(kwargs)
+            return anim_cls(*args, **anim_kwargs)
+        return RecolorLayer(self.edge_layer, [edge.id], color, from_color=from_color, **kwargs)
+
+    def clean_edge(self, edge: Edge):
+        """Settle the edge on its latest line before recolouring it again. Edge layers need no cleaning."""
+        if self.edge_layer is None:
+            edge.clean(self.scene)
+
     def clean_edges(self):
+        """Called after playing, so lines the played animations used can be recoloured again later."""
+        if self.edge_layer is not None:
+            return
         for edge in self.all_edges:
             edge.clean(self.scene)
+            edge.recycle(self.scene)
 
 
 class TestScene(Scene):
@@ -364,21 +649,21 @@ class TestScene(Scene):
 
         c.search_init('F', 'C')
 
-        self.play(*c.propogate_color_change(
+        self.play(Timeline(*c.propogate_color_change(
             c['F'], c.neighbours('F'), YELLOW,
             on_hit_color=GREEN,
             after_hit_color=PURPLE,
             at_once=False, push_to_iterable=True,
-        ))
+        )))
 
         c.clean_edges()
 
-        self.play(*c.propogate_color_change(
+        self.play(Timeline(*c.propogate_color_change(
             c['C'], c.neighbours('C'), YELLOW,
             on_hit_color=GREEN,
             after_hit_color=PURPLE,
             at_once=True, push_to_iterable=True,
-        ))
+        )))
 
         self.wait(0.2)
 
@@ -400,8 +685,8 @@ class TestScene(Scene):
         predecessor_map[d['I']] = d['G']
         predecessor_map[d['J']] = d['I']
 
-        self.play(*d.propogate_from_predecessor_map(
+        self.play(Timeline(*d.propogate_from_predecessor_map(
             d['F'], predecessor_map, YELLOW,
             on_hit_success=GREEN, on_hit_fail=RED, after_hit_success=PURPLE, after_hit_fail='previous',
             vertex_color=ORANGE, at_once=False, include_failing_edges=True, push_to_iterable=True,
-        ))
+        )))
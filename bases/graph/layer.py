@@ -0,0 +1,155 @@
+"""
+All of a graph's edges as one mobject.
+
+Every edge is a slot, indexed by edge id, in flat arrays holding its two ends, its colour and stroke
+width, how much of it is drawn, and up to one new colour growing along it from each end. Segments that
+share a colour and width are drawn together as one VMobject, so the camera walks a handful of mobjects
+each frame however many edges the graph has.
+"""
+from typing import Iterable
+
+from big_ol_pile_of_manim_imports import *
+from manim_pathing.helpers import *
+
+# Recolours grow in from an edge's start (v1) or its end (v2).
+FROM_START, FROM_END = range(2)
+
+
+class EdgeSegments(VMobject):
+    """Straight segments, one cubic curve each, every one its own subpath."""
+
+    def get_subpaths_from_points(self, points):
+        nppcc = self.n_points_per_cubic_curve
+        return list(points.reshape(-1, nppcc, points.shape[-1]))
+
+
+class EdgeLayer(BatchedLayer, VGroup):
+
+    def __init__(self, color=WHITE, stroke_width=DEFAULT_STROKE_WIDTH * 2):
+        super().__init__()
+        self.default_rgb = as_rgb(color)
+        self.default_width = stroke_width
+        self.starts = np.zeros((0, 3))
+        self.ends = np.zeros((0, 3))
+        self.rgbs = np.zeros((0, 3))
+        self.widths = np.zeros(0)
+        # Fraction of each edge drawn, from its start.
+        self.drawn = np.zeros(0)
+        # Colour growing in from either end of each edge and how far along it has got, 0 for none.
+        self.overlay_rgbs = np.zeros((0, 2, 3))
+        self.overlay_progress = np.zeros((0, 2))
+
+    @property
+    def n_slots(self) -> int:
+        return len(self.drawn)
+
+    def reserve(self, n_slots: int):
+        """Make room for edge ids up to n_slots, new slots are undrawn in the default colour."""
+        old = self.n_slots
+        if n_slots <= old:
+            return
+        n_slots = max(n_slots, 2 * old)
+        extra = n_slots - old
+        self.starts = np.concatenate([self.starts, np.zeros((extra, 3))])
+        self.ends = np.concatenate([self.ends, np.zeros((extra, 3))])
+        self.rgbs = np.concatenate([self.rgbs, np.tile(self.default_rgb, (extra, 1))])
+        self.widths = np.concatenate([self.widths, np.full(extra, float(self.default_width))])
+        self.drawn = np.concatenate([self.drawn, np.zeros(extra)])
+        self.overlay_rgbs = np.concatenate([self.overlay_rgbs, np.zeros((extra, 2, 3))])
+        self.overlay_progress = np.concatenate([self.overlay_progress, np.zeros((extra, 2))])
+
+    # Bulk setters, each takes a sequence of edge ids and changes all of them at once.
+    def set_segments(self, ids: Iterable[int], starts, ends):
+        ids = np.asarray(ids, dtype=int)
+        if len(ids):
+            self.reserve(ids.max() + 1)
+        self.starts[ids] = starts
+        self.ends[ids] = ends
+        self.dirty = True
+
+    def set_widths(self, ids: Iterable[int], stroke_width):
+        self.widths[ids] = stroke_width
+        self.dirty = True
+
+    def set_drawn(self, ids: Iterable[int], fraction):
+        self.drawn[ids] = fraction
+        self.dirty = True
+
+    def set_overlay(self, ids: Iterable[int], sides, color, progress):
+        """Grow color progress of the way along each edge from the side given, FROM_START or FROM_END."""
+        self.overlay_rgbs[ids, sides] = as_rgb(color)
+        self.overlay_progress[ids, sides] = progress
+        self.dirty = True
+
+    def refresh(self):
+        """Rebuild one submobject per colour and width from the slots, if any changed."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        vectors = self.ends - self.starts
+        shown = np.flatnonzero(self.drawn > 0)
+        tails = [self.starts[shown]]
+        heads = [self.starts[shown] + self.drawn[shown, None] * vectors[shown]]
+        rgbs = [self.rgbs[shown]]
+        widths = [self.widths[shown]]
+        levels = [np.zeros(len(shown), dtype=int)]
+        for side, origins, directions in ((FROM_START, self.starts, vectors), (FROM_END, self.ends, -vectors)):
+            # Growing colours go above every edge's own colour.
+            grown = np.flatnonzero(self.overlay_progress[:, side] > 0)
+            tails.append(origins[grown])
+            heads.append(origins[grown] + self.overlay_progress[grown, side, None] * directions[grown])
+            rgbs.append(self.overlay_rgbs[grown, side])
+            widths.append(self.widths[grown])
+            levels.append(np.ones(len(grown), dtype=int))
+        tails, heads = np.concatenate(tails), np.concatenate(heads)
+
+        if not len(tails):
+            self.clear_groups(0)
+            return
+        # One integer key per segment, ordered by level, then colour, then width.
+        stroke_widths, width_index = np.unique(np.concatenate(widths), return_inverse=True)
+        keys = (np.concatenate(levels) << 24) | rgb_codes(np.concatenate(rgbs))
+        keys, order, splits = group_by_key(keys * len(stroke_widths) + width_index.reshape(-1))
+        codes, width_index = np.divmod(keys, len(stroke_widths))
+        tails, heads = tails[order], heads[order]
+        # Each segment is a cubic curve with its handles a third of the way in from either end.
+        points = np.stack([tails, (2 * tails + heads) / 3, (tails + 2 * heads) / 3, heads], axis=1)
+        for index, (code, width, group_points) in enumerate(zip(
+            codes & 0xffffff, stroke_widths[width_index], np.split(points, splits),
+        )):
+            segments = self.style_group(index, EdgeSegments)
+            segments.points = group_points.reshape(-1, 3)
+            segments.set_stroke(color=code_to_hex(code), width=float(width), opacity=1)
+        self.clear_groups(len(keys))
+
+
+class DrawEdges(LayerAnimation):
+    """Draws edges in from their start, or takes them out again with uncreate."""
+
+    def __init__(self, layer: EdgeLayer, ids: Iterable[int], uncreate=False, **kwargs):
+        self.uncreate = uncreate
+        super().__init__(layer, ids, **kwargs)
+
+    def interpolate_slots(self, index, alpha):
+        self.mobject.set_drawn(self.slots[index], 1 - alpha if self.uncreate else alpha)
+
+
+class GrowEdgeColor(LayerAnimation):
+    """
+    Recolours edges by growing color along them from the side given, FROM_START or FROM_END. Edges not
+    drawn yet are drawn by it.
+    """
+
+    def __init__(self, layer: EdgeLayer, ids: Iterable[int], color, sides=FROM_START, **kwargs):
+        self.rgb = as_rgb(color)
+        super().__init__(layer, ids, **kwargs)
+        self.sides = np.broadcast_to(np.asarray(sides, dtype=int), self.slots.shape)
+
+    def interpolate_slots(self, index, alpha):
+        done = alpha >= 1
+        growing, grown = index[~done], index[done]
+        self.mobject.set_overlay(self.slots[growing], self.sides[growing], self.rgb, alpha[~done])
+        if len(grown):
+            self.mobject.set_colors(self.slots[grown], self.rgb)
+            self.mobject.set_drawn(self.slots[grown], 1)
+            self.mobject.set_overlay(self.slots[grown], self.sides[grown], self.rgb, 0)
@@ -3,6 +3,26 @@ from big_ol_pile_of_manim_imports import *
 from manim_pathing.helpers import *
 from typing import Optional
 
+class HeadlessVertex:
+    """Stand in for Vertex in a VisualGraph without a scene, the same key and position but no mobject."""
+
+    def __init__(self, key, pos):
+        self.key = key
+        self.pos = pos
+        self.text = None
+
+    def __str__(self):
+        return f"Vertex({self.key})"
+
+    @property
+    def x(self):
+        return self.pos[0]
+
+    @property
+    def y(self):
+        return self.pos[1]
+
+
 class Vertex(Circle):
 
     VERTEX_CONFIG = {
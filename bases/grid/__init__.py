@@ -1,3 +1,4 @@
-from manim_pathing.bases.grid.vertex import Vertex
+from manim_pathing.bases.grid.vertex import Vertex, HeadlessVertex, LayerVertex
 from manim_pathing.bases.grid.edge import Edge
+from manim_pathing.bases.grid.layer import CellLayer, CellRaster
 from manim_pathing.bases.grid.grid import VisualGrid
@@ -9,12 +9,20 @@ class Edge:
         'stroke_width': DEFAULT_STROKE_WIDTH * 2,
     }
 
+    # Most spare lines an edge holds on to for later recolours.
+    SPARE_LINES = 3
+
     def __init__(self, v1: grid.Vertex, v2: grid.Vertex, weight, **kwargs):
         self.v1 = v1
         self.v2 = v2
         self.weight = weight
+        # Assigned by the owning VisualGrid, stable for the lifetime of the edge.
+        self.id = None
         self.line_obj = None
         self.tmp_lines = []
+        # Lines clean() took out of the scene, animations built before it may still use them until played.
+        self.released_lines = []
+        self.spare_lines = []
 
     @property
     def length(self):
@@ -36,6 +44,21 @@ class Edge:
             **config,
         )
 
+    def _overlay_line(self, v1: grid.Vertex, v2: grid.Vertex, color) -> Line:
+        """A line v1 -> v2 in color, a spare one moved into place if there is one."""
+        if not self.spare_lines:
+            return self._gen_line_with_args(v1, v2, color=color)
+        line = self.spare_lines.pop()
+        line.put_start_and_end_on(v1.get_center(), v2.get_center())
+        line.set_stroke(color, opacity=1)
+        return line
+
+    def _copy_line(self, line: Line) -> Line:
+        """A copy of line, a spare one made to match it if there is one."""
+        if not self.spare_lines:
+            return line.copy()
+        return self.spare_lines.pop().become(line)
+
     def draw(self, direction='f', **kwargs) -> Animation:
         if direction == 'f':
             self.line_obj = self._gen_line_with_args(self.v1, self.v2, **kwargs)
@@ -53,19 +76,19 @@ class Edge:
         if from_v is None:
             original = self.line_obj if not self.tmp_lines else self.tmp_lines[-1]
             if from_color is not None:
-                self.tmp_lines.append(original.copy())
+                self.tmp_lines.append(self._copy_line(original))
                 self.tmp_lines[-1].set_color(from_color)
                 original = self.tmp_lines[-1]
-            self.tmp_lines.append(original.copy())
+            self.tmp_lines.append(self._copy_line(original))
             self.tmp_lines[-1].set_color(color)
-            animation = Transform(original, self.tmp_lines[-1], **kwargs)
             if class_mode:
                 return SuccessiveTransform, self.tmp_lines[-2:], kwargs
+            animation = Transform(original, self.tmp_lines[-1], **kwargs)
         else:
             if from_v == self.v1:
-                self.tmp_lines.append(self._gen_line_with_args(self.v1, self.v2, color=color))
+                self.tmp_lines.append(self._overlay_line(self.v1, self.v2, color))
             elif from_v == self.v2:
-                self.tmp_lines.append(self._gen_line_with_args(self.v2, self.v1, color=color))
+                self.tmp_lines.append(self._overlay_line(self.v2, self.v1, color))
             else:
                 raise ValueError('from_v must be an adjacent vertex.')
             animation = ShowCreation(self.tmp_lines[-1], **kwargs)
@@ -80,6 +103,20 @@ class Edge:
         scene.remove(self.line_obj)
         if self.tmp_lines:
             scene.remove(*self.tmp_lines)
+            self.released_lines.append(self.line_obj)
+            self.released_lines.extend(self.tmp_lines[:-1])
             self.line_obj = self.tmp_lines[-1]
             self.tmp_lines = []
         scene.add(self.line_obj)
+
+    def recycle(self, scene: Scene):
+        """
+        Make the lines clean() released spare, to be recoloured in place by later change_color calls.
+        Only call once every animation built before the last clean() has been played.
+        """
+        if not self.released_lines:
+            return
+        scene.remove(*self.released_lines)
+        room = self.SPARE_LINES - len(self.spare_lines)
+        self.spare_lines.extend(self.released_lines[:room])
+        self.released_lines = []
@@ -1,9 +1,10 @@
-import itertools
-import os
 from collections import defaultdict
 from typing import Dict, DefaultDict, Optional, Union, Tuple, List, Iterable
 from big_ol_pile_of_manim_imports import *
 import manim_pathing.bases.grid as grid
+import manim_pathing.core.grid as core_grid
+from manim_pathing.bases.graph.layer import EdgeLayer, GrowEdgeColor, FROM_START, FROM_END
+from manim_pathing.core import GridCore, MAPS, Trace, TraceWriter, TraceFile
 from manim_pathing.helpers import *
 
 class VisualGrid:
@@ -12,172 +13,439 @@ class VisualGrid:
         '.','wT@','s','e',
     )
 
-    TILES = 'tiles'
-    OCTAL = 'octal'
-    OCTAL_NO_CORNERS = 'octal_no_corners'
+    # Gridtype used to draw each core cell type.
+    CELL_GRIDTYPES = {
+        core_grid.EMPTY: EMPTY_TYPE[0],
+        core_grid.WALL: WALL_TYPE[-1],
+        core_grid.START: START_TYPE[0],
+        core_grid.END: END_TYPE[0],
+    }
 
+    MAP_REGISTRY = MAPS
+
+    TILES = core_grid.TILES
+    OCTAL = core_grid.OCTAL
+    OCTAL_NO_CORNERS = core_grid.OCTAL_NO_CORNERS
+
+    # Can be switched at any time, each method's neighbour table is built once and then kept up to date.
     TRAVERSAL_METHOD = OCTAL_NO_CORNERS
 
-    DIAG_DIST = round(np.sqrt(2), 4)
-
-    def __init__(self, filename, scene, **kwargs):
-        self.scene: Scene = scene
-        lines = list(open(os.path.join('manim_pathing/maps/', filename), 'r').readlines())
-        for index in range(len(lines)):
-            if lines[index].startswith('map'):
-                lines = lines[index+1:]
-                break
-
-        lines = [line.strip('\n') for line in lines]
-        for index in range(len(lines)-1, -1, -1):
-            if lines[index]:
-                break
-            del lines[index]
-
-        map_vals = lines
-        height_dim = len(map_vals)
-        width_dim = len(map_vals[0])
+    DIAG_DIST = core_grid.DIAG_DIST
+
+    PROPOGATION_SPEED = 1
+
+    START_COLOR = GREEN
+    END_COLOR = RED
+
+    DISCOVER_COLOR = YELLOW
+    EXPAND_COLOR = ORANGE
+
+    EDGE_DISCOVERY = YELLOW
+    EDGE_SUCCESS = PURPLE
+    EDGE_FAIL = 'previous'
+    EDGE_SUCCESS_FLASH = GREEN
+    EDGE_FAIL_FLASH = RED
+
+    CURRENT_VERTS = '#F4A460'
+
+    # Only build squares once they are looked up or come into the camera frame.
+    LAZY_SQUARES = False
+
+    # Draw every cell into one CellLayer rather than a square each, for large maps. Cells looked up get a
+    # LayerVertex made on the spot rather than a square, edges and rings are placed from the cell's centre.
+    CELL_LAYER = False
+
+    # Draw cells as the pixels of one image instead, for maps of hundreds of thousands of cells and more.
+    # Edges then always go through an edge layer.
+    CELL_RASTER = False
+    RASTER_PIXELS_PER_CELL = 1
+
+    # Draw every edge into one EdgeLayer rather than a line each.
+    EDGE_LAYER = False
+
+    # Colour each core cell type is filled with, as grid.Vertex.set_gridtype fills its square.
+    CELL_COLORS = {
+        core_grid.EMPTY: WHITE,
+        core_grid.WALL: BLACK,
+        core_grid.START: GREEN,
+        core_grid.END: RED,
+    }
+
+    def __init__(self, filename, scene: Optional[Scene], **kwargs):
+        """Without a scene the grid is headless, searches still run but nothing is drawn or built to draw."""
+        self.scene: Optional[Scene] = scene
+        # The registry copy is shared, ours gets written to as cells change type.
+        self.map: GridCore = self.MAP_REGISTRY.load_grid(filename).copy()
+        height_dim, width_dim = self.map.shape
         length_height = kwargs.get('height', 5) / height_dim
         length_width = kwargs.get('width', 9) / width_dim
         self.side_length = min(length_height, length_width)
 
-        self.squares = [
-            [
-                grid.Vertex((x, y), side_length=self.side_length)
-                for y in range(width_dim)
-            ]
-            for x in range(height_dim)
-        ]
-        self.edges = defaultdict(lambda: defaultdict(lambda: None))
+        # Squares by cell id (x * width + y), cells without a square only exist in self.map.
+        # Strings, tuples and squares are turned into cell ids by cell_of() as they come in.
+        self.squares: Dict[int, grid.Vertex] = {}
+        # Edges are implied by the map and TRAVERSAL_METHOD. Only the ones something has looked up
+        # (usually to animate them) exist, keyed by edge_key() of their two cell ids.
+        self.edges: Dict[int, grid.Edge] = {}
+        # TRAVERSAL_METHOD the built edges were derived under, they are all dropped once it changes.
+        self._edges_method = self.TRAVERSAL_METHOD
+        self._next_edge_id = 0
+        # Built when CELL_LAYER or CELL_RASTER is set, cell colours then live in the layer rather than on squares.
+        self.cell_layer: Optional[Union[grid.CellLayer, grid.CellRaster]] = None
+        # Built when EDGE_LAYER or CELL_RASTER is set, edges then have no lines of their own.
+        self.edge_layer: Optional[EdgeLayer] = None
 
-        for x in range(height_dim):
-            for y in range(width_dim):
-                self[x, y].set_gridtype(map_vals[x][y])
+        if self.headless:
+            return
+        if self.EDGE_LAYER or self.CELL_RASTER:
+            self.edge_layer = EdgeLayer(**grid.Edge.CONFIG)
+        if self.CELL_LAYER or self.CELL_RASTER:
+            length = grid.Vertex.VERTEX_CONFIG['length']
+            if self.CELL_RASTER:
+                self.cell_layer = grid.CellRaster(self.map.shape, length, self.RASTER_PIXELS_PER_CELL)
+            else:
+                self.cell_layer = grid.CellLayer(self.map.shape, length, grid.Vertex.SIDE_MARGIN)
+            palette = np.zeros((max(self.CELL_COLORS) + 1, 3))
+            for code, color in self.CELL_COLORS.items():
+                palette[code] = as_rgb(color)
+            self.cell_layer.set_colors(slice(None), palette[self.map.cells.ravel()])
+            return
+
+        if self.LAZY_SQUARES:
+            return
 
-        for square in self.all_squares:
-            for (square2, dist) in self.gen_neigbours(square, with_weights=True):
-                if square.key < square2.key:
-                    self[square, square2] = grid.Edge(square, square2, dist)
+        for cell in range(height_dim * width_dim):
+            self.cell_square(cell)
 
     # Properties and method overrides
+    @property
+    def headless(self) -> bool:
+        return self.scene is None
+
     @property
     def all_squares(self) -> Iterable[grid.Vertex]:
-        return itertools.chain(*self.squares)
+        """Every square built so far, which is every cell unless LAZY_SQUARES is set."""
+        return self.squares.values()
+
+    def square(self, x: int, y: int) -> grid.Vertex:
+        """The square for a cell, built on first use."""
+        return self.cell_square(self.cell_of((x, y)))
+
+    def cell_square(self, cell: int) -> grid.Vertex:
+        if self.cell_layer is not None:
+            # Layer-backed cells keep nothing, so touching every cell in a search costs no memory.
+            square = grid.LayerVertex(divmod(cell, self.map.width), cell=cell)
+            square.set_gridtype(self.CELL_GRIDTYPES[self.map.cells.flat[cell]])
+            return square
+        square = self.squares.get(cell)
+        if square is None:
+            x, y = divmod(cell, self.map.width)
+            if self.headless:
+                square = grid.HeadlessVertex((x, y), cell=cell)
+            else:
+                square = grid.Vertex((x, y), cell=cell, side_length=self.side_length)
+            square.set_gridtype(self.CELL_GRIDTYPES[self.map.cells.flat[cell]])
+            self.squares[cell] = square
+        return square
+
+    def visible_cells(self, margin=1) -> Tuple[range, range]:
+        """Row and column ranges of the cells inside the camera frame, padded by margin cells."""
+        camera = self.scene.camera
+        frame = getattr(camera, 'frame', None)
+        if frame is not None:
+            center, frame_width, frame_height = frame.get_center(), frame.get_width(), frame.get_height()
+        else:
+            center, frame_width, frame_height = camera.frame_center, camera.frame_width, camera.frame_height
+        length = grid.Vertex.VERTEX_CONFIG['length']
+        height, width = self.map.shape
+        # Square (x, y) is centred on (y * length, -x * length).
+        rows = range(
+            max(0, int(np.floor(-(center[1] + frame_height / 2) / length)) - margin),
+            min(height, int(np.ceil(-(center[1] - frame_height / 2) / length)) + margin + 1),
+        )
+        cols = range(
+            max(0, int(np.floor((center[0] - frame_width / 2) / length)) - margin),
+            min(width, int(np.ceil((center[0] + frame_width / 2) / length)) + margin + 1),
+        )
+        return rows, cols
+
+    def realise_visible(self) -> List[grid.Vertex]:
+        """Build the squares inside the camera frame, returning the ones that are new."""
+        if self.cell_layer is not None:
+            return []
+        rows, cols = self.visible_cells()
+        width = self.map.width
+        new_squares = []
+        for x in rows:
+            for y in cols:
+                if x * width + y not in self.squares:
+                    new_squares.append(self.cell_square(x * width + y))
+        return new_squares
+
+    def track_camera(self) -> Mobject:
+        """
+        An invisible mobject which, once added to the scene, adds squares as they come into frame.
+        Only useful with LAZY_SQUARES and a moving camera.
+        """
+        tracker = Mobject()
+
+        def update_tracker(mob):
+            new_squares = self.realise_visible()
+            if new_squares:
+                self.scene.add(*new_squares)
+        tracker.add_updater(update_tracker)
+        return tracker
+
+    @property
+    def max_length(self):
+        return self.DIAG_DIST if self.TRAVERSAL_METHOD != self.TILES else 1
 
     @property
     def all_edges(self) -> Iterable[grid.Edge]:
-        return (
-            self[x, y]
-            for x in self.all_squares
-            for y in self.all_squares
-            if self[x, y] is not None
-            if x.key > y.key
-        )
+        """Every edge built so far."""
+        self._check_edges_method()
+        return self.edges.values()
 
-    def __getitem__(self, key) -> Union[grid.Vertex, Optional[grid.Edge]]:
-        if isinstance(key, list) or isinstance(key, tuple):
-            if isinstance(key[0], int):
-                return self.squares[key[0]][key[1]]
-            if isinstance(key[0], grid.Vertex):
-                v1 = key[0]
-                v2 = key[1]
-                if v1.key < v2.key:
-                    return self.edges[v1][v2]
-                return self.edges[v2][v1]
-            if isinstance(key[0], str):
-                return self[self[key[0]], self[key[1]]]
-        if isinstance(key, grid.Vertex):
-            return key
+    def edge_weight(self, key1, key2) -> Optional[float]:
+        """Weight of the edge joining two cells, None if TRAVERSAL_METHOD doesn't join them."""
+        return self._cell_edge_weight(self.cell_of(key1), self.cell_of(key2))
+
+    def _cell_edge_weight(self, cell1: int, cell2: int) -> Optional[float]:
+        if not self.map.joined(cell1, cell2, self.TRAVERSAL_METHOD):
+            return None
+        x1, y1 = divmod(cell1, self.map.width)
+        x2, y2 = divmod(cell2, self.map.width)
+        return self.DIAG_DIST if x1 != x2 and y1 != y2 else 1
+
+    def cell_of(self, key) -> int:
+        """
+        Cell id for anything accepted at the public boundary: a cell id, square,
+        (x, y) pair or '(x, y)' string. Everything internal is keyed by cell id.
+        """
+        if isinstance(key, (grid.Vertex, grid.HeadlessVertex)):
+            return key.cell
+        if isinstance(key, (int, np.integer)):
+            return int(key)
         if isinstance(key, str):
-            return self[list(map(int, key[1:-1].split(',')))]
+            key = key[1:-1].split(',')
+        x, y = int(key[0]), int(key[1])
+        height, width = self.map.shape
+        if not (0 <= x < height and 0 <= y < width):
+            raise IndexError(f'({x}, {y}) is outside the {height}x{width} grid.')
+        return x * width + y
+
+    def is_pair(self, key) -> bool:
+        """Whether a key names an edge (two cells) rather than one cell."""
+        return isinstance(key, (list, tuple)) and not isinstance(key[0], (int, np.integer))
+
+    def edge_key(self, cell1: int, cell2: int) -> int:
+        if cell1 > cell2:
+            cell1, cell2 = cell2, cell1
+        return cell1 * self.map.cells.size + cell2
+
+    def _check_edges_method(self):
+        """Forget every built edge if TRAVERSAL_METHOD changed since they were built."""
+        if self._edges_method != self.TRAVERSAL_METHOD:
+            self.edges.clear()
+            self._edges_method = self.TRAVERSAL_METHOD
+
+    def _forget_edges_around(self, cell: int):
+        """
+        Forget built edges a cell changing type may have cut, those between any two cells of the 3x3 block
+        around it, as diagonals past a corner depend on it too.
+        """
+        x, y = divmod(cell, self.map.width)
+        height, width = self.map.shape
+        block = [
+            block_x * width + block_y
+            for block_x in range(max(x - 1, 0), min(x + 2, height))
+            for block_y in range(max(y - 1, 0), min(y + 2, width))
+        ]
+        for index, cell1 in enumerate(block):
+            for cell2 in block[index + 1:]:
+                edge_key = self.edge_key(cell1, cell2)
+                if edge_key in self.edges and self._cell_edge_weight(cell1, cell2) is None:
+                    del self.edges[edge_key]
+
+    def __getitem__(self, key) -> Union[grid.Vertex, Optional[grid.Edge]]:
+        if self.is_pair(key):
+            self._check_edges_method()
+            cell1, cell2 = self.cell_of(key[0]), self.cell_of(key[1])
+            edge_key = self.edge_key(cell1, cell2)
+            edge = self.edges.get(edge_key)
+            if edge is None:
+                weight = self._cell_edge_weight(cell1, cell2)
+                if weight is not None:
+                    cell1, cell2 = min(cell1, cell2), max(cell1, cell2)
+                    edge = self._store_edge(edge_key, grid.Edge(self.cell_square(cell1), self.cell_square(cell2), weight))
+            return edge
+        return self.cell_square(self.cell_of(key))
 
     def __setitem__(self, key, value):
-        if isinstance(key, list) or isinstance(key, tuple):
-            if isinstance(key[0], int):
-                self.squares[key[0]][key[1]] = value
-            if isinstance(key[0], str):
-                self.edges[self[key[0]]][self[key[1]]] = value
-            if isinstance(key[0], grid.Vertex):
-                v1 = key[0]
-                v2 = key[1]
-                if v1.key < v2.key:
-                    self.edges[v1][v2] = value
-                else:
-                    self.edges[v2][v1] = value
-        if isinstance(key, str):
-            x, y = list(map(int, key[1:-1].split(',')))
-            self.squares[x][y] = value
+        if self.is_pair(key):
+            edge_key = self.edge_key(self.cell_of(key[0]), self.cell_of(key[1]))
+            if value is None:
+                self.edges.pop(edge_key, None)
+            else:
+                self._store_edge(edge_key, value)
+        else:
+            self.squares[self.cell_of(key)] = value
+
+    def _store_edge(self, edge_key: int, edge: grid.Edge) -> grid.Edge:
+        if edge.id is None:
+            edge.id = self._next_edge_id
+            self._next_edge_id += 1
+        self.edges[edge_key] = edge
+        if self.edge_layer is not None:
+            self.edge_layer.set_segments([edge.id], [self.cell_center(edge.v1)], [self.cell_center(edge.v2)])
+        return edge
+
+    def cell_center(self, key) -> np.ndarray:
+        """Where a cell's square is centred, without building the square."""
+        x, y = divmod(self.cell_of(key), self.map.width)
+        length = grid.Vertex.VERTEX_CONFIG['length']
+        return np.array([y * length, -x * length, 0])
+
+    def cell_top(self, key) -> np.ndarray:
+        """The middle of the top side of a cell's square, to put things next_to, without building the square."""
+        length = grid.Vertex.VERTEX_CONFIG['length']
+        return self.cell_center(key) + UP * length * (0.5 - grid.Vertex.SIDE_MARGIN)
 
     # Generic Animation
     def draw_vertices(self, anim_class=FadeInFromDown, **kwargs) -> Iterable[Animation]:
+        if self.cell_layer is not None:
+            self.cell_layer.refresh()
+            return (anim_class(self.cell_layer, **kwargs),)
+        if self.LAZY_SQUARES:
+            self.realise_visible()
         return (
-            anim_class(grid.vertex, **kwargs)
-            for grid.vertex in self.all_squares
+            anim_class(vertex, **kwargs)
+            for vertex in self.all_squares
         )
 
     def destroy(self, anim_class=Uncreate, **kwargs) -> Animation:
-        anim1 = [anim_class(e.line_obj) for e in self.all_edges if e.line_obj]
-        anim2 = [anim_class(v) for v in self.all_squares]
+        if self.edge_layer is not None:
+            anim1 = [anim_class(self.edge_layer)]
+        else:
+            anim1 = [anim_class(e.line_obj) for e in self.all_edges if e.line_obj]
+        if self.cell_layer is not None:
+            anim2 = [anim_class(self.cell_layer)]
+        else:
+            anim2 = [anim_class(v) for v in self.all_squares]
         return AnimationGroup(*anim1, *anim2)
 
+    def path_polyline(self, keys, **kwargs) -> VMobject:
+        """One line through the centres of the cells given, in order."""
+        config = dict(grid.Edge.CONFIG)
+        config.update(kwargs)
+        polyline = VMobject(**config)
+        polyline.set_points_as_corners([self.cell_center(key) for key in keys])
+        return polyline
+
+    def draw_path(self, keys, color=GREEN, **kwargs) -> Animation:
+        """Draw a path over the cells as one polyline, however many cells it crosses."""
+        return ShowCreation(self.path_polyline(keys, color=color), **kwargs)
+
+    def set_gridtype(self, key, gridtype, anim=False):
+        """Change a cell's type, keeping the map array in step with the square."""
+        cell = self.cell_of(key)
+        code = self.gridtype_code(gridtype)
+        self._retype_cell(cell, code)
+        if self.cell_layer is None:
+            return self.cell_square(cell).set_gridtype(gridtype, anim=anim)
+        square = self.cell_square(cell)
+        square.set_gridtype(gridtype)
+        color = self.CELL_COLORS[code]
+        if anim:
+            return AnimationGroup(self.fill_cells([cell], color, anim=True), square.get_update_ring(color))
+        self.fill_cells([cell], color)
+
+    def _retype_cell(self, cell: int, code: int):
+        """Change a cell's type in the map alone, squares and layers are left to the caller."""
+        self.map.set_cell(*divmod(cell, self.map.width), code)
+        self._forget_edges_around(cell)
+
+    def fill_cells(self, keys, color, anim=False, **kwargs) -> Optional[Animation]:
+        """Fill every cell given with color, returning an animation doing so instead if anim is set."""
+        cells = [self.cell_of(key) for key in keys]
+        if self.cell_layer is not None:
+            if anim:
+                return RecolorLayer(self.cell_layer, cells, color, **kwargs)
+            self.cell_layer.set_colors(cells, color)
+            self.cell_layer.refresh()
+            return
+        squares = [self.cell_square(cell) for cell in cells]
+        if anim:
+            return AnimationGroup(*(ApplyMethod(square.set_fill, color, **kwargs) for square in squares))
+        for square in squares:
+            square.set_fill(color)
+
     def search_init(self, start, end):
         self.iteration = 0
-        self.start = self[start]
-        self.end = self[end]
+        self.start_cell = self.cell_of(start)
+        self.end_cell = self.cell_of(end)
+        self.start = self.cell_square(self.start_cell)
+        self.end = self.cell_square(self.end_cell)
+        if self.headless:
+            self.set_gridtype(self.start, self.START_TYPE)
+            self.set_gridtype(self.end, self.END_TYPE)
+            return
 
         self.scene.play(
-            self.start.set_gridtype(self.START_TYPE, anim=True),
-            self.end.set_gridtype(self.END_TYPE, anim=True),
+            self.set_gridtype(self.start, self.START_TYPE, anim=True),
+            self.set_gridtype(self.end, self.END_TYPE, anim=True),
         )
 
+    # Traces, searches make self.recorder in search_init and play trace steps with play_steps.
+    def record(self, filename: Optional[str] = None) -> Trace:
+        """
+        Run the search set up by search_init to the end without drawing anything, returning its trace.
+        Given a filename, events are streamed to that file as the search runs and it is read back instead.
+        """
+        if filename is None:
+            self.play_steps(self.recorder.steps(), anim=False)
+            return self.recorder.trace
+        with TraceWriter(filename) as writer:
+            self.recorder.trace = writer
+            self.play_steps(self.recorder.steps(), anim=False)
+        self.trace = TraceFile(filename)
+        return self.trace
+
+    def replay(self, trace: Trace, anim=True):
+        """Play back a trace of the search set up by search_init, instead of searching again."""
+        self.trace = trace
+        self.play_steps(trace.steps(), anim=anim and not self.headless)
+
     # Computation Helpers
+    def gridtype_code(self, gridtype) -> int:
+        for code, chars in core_grid.CELL_CHARS.items():
+            if gridtype in chars:
+                return code
+        raise ValueError(f'Unknown gridtype {gridtype}.')
+
+    def traversable(self, key) -> bool:
+        return bool(self.map.traversable.flat[self.cell_of(key)])
+
     def dist(self, sq1: grid.Vertex, sq2: grid.Vertex):
-        diag = min(np.abs(sq1.x - sq2.x), np.abs(sq1.y - sq2.y))
-        horizontal = max(np.abs(sq1.x - sq2.x), np.abs(sq1.y - sq2.y)) - diag
-        return horizontal + diag * self.DIAG_DIST
+        return core_grid.octile_distance(sq1.x, sq1.y, sq2.x, sq2.y)
 
     def gen_neigbours(self, key, with_weights=False, exclude_nontraversable=True):
-        square: grid.Vertex = self[key]
-        points = [
-            (square.x + 1, square.y),
-            (square.x - 1, square.y),
-            (square.x, square.y + 1),
-            (square.x, square.y - 1),
-        ]
-        points = list(filter(lambda key: (
-            0 <= key[0] < len(self.squares) and
-            0 <= key[1] < len(self.squares[0])
-        ), points))
-        for x_change in (-1, 1):
-            for y_change in (-1, 1):
-                if (
-                    0 <= square.x + x_change < len(self.squares) and
-                    0 <= square.y + y_change < len(self.squares[0])
-                ):
-                    if (
-                        self.TRAVERSAL_METHOD == self.OCTAL or
-                        (
-                            self.TRAVERSAL_METHOD == self.OCTAL_NO_CORNERS and
-                            self[square.x + x_change, square.y].traversable and
-                            self[square.x, square.y + y_change].traversable
-                        )
-                    ) or not exclude_nontraversable:
-                        points.append((square.x + x_change, square.y + y_change))
+        method = self.TRAVERSAL_METHOD if exclude_nontraversable else core_grid.ALL_NEIGHBOURS
         return [
-            (
-                self[x, y],
-                self.dist(square, self[x, y])
-            ) if with_weights else self[x, y]
-            for x, y in points
-            if (self[x, y].traversable or not exclude_nontraversable)
+            (self.cell_square(cell), weight) if with_weights else self.cell_square(cell)
+            for cell, weight in self.map.neighbours(self.cell_of(key), method)
         ]
 
     # Pathfinding/General Propogation Animations
     def propogate_color_change(
         self, start, ends, edge_color,
         at_once=True, on_hit_color=None, after_hit_color=None,
-        end_type=None, push_to_iterable=False, **edge_kwargs,
+        end_type=None, end_color=None, push_to_iterable=False, **edge_kwargs,
     ):
+        """
+        With an edge layer every edge is recoloured by one GrowEdgeColor and one RecolorLayer, and with a
+        cell layer every end is filled by one RecolorLayer, all kept under start.
+        """
         if not ends:
             return [] if push_to_iterable else {}
         edges: List[Edge] = [self[start, end] for end in ends]
@@ -188,53 +456,95 @@ class VisualGrid:
         store_old_color = {}
         store_on_hit_color = {}
         store_after_hit_color = {}
+        per_end, batched_kinds = self.propogation_plan(end_type, end_color)
+        # Ends filled by the cell layer, with their colours and when propogation reaches them.
+        filled, filled_colors, filled_delays = [], [], []
         for end, edge in zip(ends, edges):
-            edge.clean(self.scene)
-            store_old_color[edge] = edge.line_obj.get_color() if edge.line_obj else 'draw'
+            self.clean_edge(edge)
+            store_old_color[edge] = self.edge_color(edge) or 'draw'
+            # An edge being drawn for the first time has no previous color, keep the propogation color.
+            previous_color = edge_color if store_old_color[edge] == 'draw' else store_old_color[edge]
             if not on_hit_color:
                 store_on_hit_color[edge] = edge_color
             else:
                 store_on_hit_color[edge] = (
-                    store_old_color[edge]
+                    previous_color
                     if on_hit_color=='previous'
                     else on_hit_color
                 )
             store_after_hit_color[edge] = (
-                store_old_color[edge]
+                previous_color
                 if after_hit_color=='previous'
                 else after_hit_color
             )
-            # Original line color change
-            extension_dict[end] = [edge.change_color(
-                edge_color,
-                from_v=start,
-                anim=True,
-                run_time=self.PROPOGATION_SPEED * (
-                    1 if at_once else edge.length / self.max_length
-                ),
-                **edge_kwargs,
-            ) if store_old_color[edge] != 'draw' else edge.draw(
-                direction=('f' if edge.v1 == start else 'b'),color=edge_color,
-            )]
-            # After edge propogation hits end
-            next_step = []
+            arrival = self.propogation_time(edge, at_once)
             if end_type:
-                next_step.append(after_animation_separate(
-                    end.set_gridtype(end_type, anim=True),
-                    *extension_dict[end],
-                ))
-            anim_cls, args, kwargs = edge.change_color(
-                store_after_hit_color[edge] or edge_color,
-                from_color=store_on_hit_color[edge],
-                anim=True,
-                class_mode=True,
-            )
-            kwargs.update({'rate_func': rush_into})
-            next_step.append(after_animation_from_succession(
-                anim_cls, args, kwargs, *extension_dict[end],
-            ))
+                code = self.gridtype_code(end_type)
+            if self.cell_layer is not None:
+                # The cell layer fills every end at once, an end's type changes now.
+                if end_type:
+                    self._retype_cell(self.cell_of(end), code)
+                    end.set_gridtype(end_type)
+                    filled.append(self.cell_of(end))
+                    filled_colors.append(as_rgb(self.CELL_COLORS[code]))
+                    filled_delays.append(arrival)
+                if end_color:
+                    filled.append(self.cell_of(end))
+                    filled_colors.append(as_rgb(end_color))
+                    filled_delays.append(arrival)
 
-            extension_dict[end].extend(next_step)
+            extension_dict[end] = []
+            for kind in per_end:
+                if kind == 'line':
+                    # Original line color change
+                    animation = self.grow_edge_color(
+                        edge,
+                        edge_color,
+                        start,
+                        run_time=arrival,
+                        **edge_kwargs,
+                    ) if store_old_color[edge] != 'draw' else self.draw_edge(edge, start, edge_color)
+                # The rest start once edge propogation hits end.
+                elif kind == 'retype':
+                    animation = after_delay(self.set_gridtype(end, end_type, anim=True), arrival)
+                elif kind == 'type_ring':
+                    animation = after_delay(end.get_update_ring(self.CELL_COLORS[code]), arrival)
+                elif kind == 'ring':
+                    animation = after_delay(end.get_update_ring(color=end_color), arrival)
+                elif kind == 'fill':
+                    animation = after_delay(self.fill_cells([end], end_color, anim=True), arrival)
+                else:  # 'fade'
+                    animation = after_delay(
+                        self.fade_edge_color(
+                            edge,
+                            store_after_hit_color[edge] or edge_color,
+                            store_on_hit_color[edge],
+                            rate_func=rush_into,
+                        ),
+                        arrival,
+                    )
+                extension_dict[end].append(animation)
+
+        batched = []
+        ids = [edge.id for edge in edges]
+        run_times = np.array([self.propogation_time(edge, at_once) for edge in edges])
+        for kind in batched_kinds:
+            if kind == 'grow_edges':
+                batched.append(GrowEdgeColor(
+                    self.edge_layer, ids, edge_color, sides=[self.edge_side(edge, start) for edge in edges],
+                    delays=0, durations=run_times, **edge_kwargs,
+                ))
+            elif kind == 'fade_edges':
+                batched.append(RecolorLayer(
+                    self.edge_layer, ids,
+                    np.array([as_rgb(store_after_hit_color[edge] or edge_color) for edge in edges]),
+                    from_color=np.array([as_rgb(store_on_hit_color[edge]) for edge in edges]),
+                    delays=run_times, rate_func=rush_into,
+                ))
+            else:
+                batched.append(RecolorLayer(self.cell_layer, filled, np.array(filled_colors), delays=filled_delays))
+        if batched:
+            extension_dict[start] = extension_dict.get(start, []) + batched
 
         if push_to_iterable:
             anims = [
@@ -245,17 +555,98 @@ class VisualGrid:
             return anims
         return extension_dict
 
+    def propogation_plan(self, end_type=None, end_color=None) -> Tuple[List[str], List[str]]:
+        """
+        The animations propogate_color_change builds, by kind: those for each end in order, then those
+        batched over every end. Planned from the layer flags, so a headless grid plans what its drawn twin plays.
+        """
+        edge_layer = self.EDGE_LAYER or self.CELL_RASTER
+        cell_layer = self.CELL_LAYER or self.CELL_RASTER
+        # Edge lines grow and then fade, an edge layer does both for every end at once.
+        per_end = [] if edge_layer else ['line']
+        if end_type:
+            per_end.append('type_ring' if cell_layer else 'retype')
+        if end_color:
+            per_end.append('ring')
+            if not cell_layer:
+                per_end.append('fill')
+        if not edge_layer:
+            per_end.append('fade')
+        batched = ['grow_edges', 'fade_edges'] if edge_layer else []
+        if cell_layer and (end_type or end_color):
+            batched.append('fill_ends')
+        return per_end, batched
+
+    def propogation_animation_count(self, n_ends, end_type=None, end_color=None, **kwargs) -> int:
+        """
+        How many animations propogate_color_change builds towards n_ends ends, without building them.
+        Takes the same keyword arguments.
+        """
+        if not n_ends:
+            return 0
+        per_end, batched = self.propogation_plan(end_type, end_color)
+        return n_ends * len(per_end) + len(batched)
+
+    def propogation_time(self, edge: grid.Edge, at_once=True) -> float:
+        return self.PROPOGATION_SPEED * (1 if at_once else edge.length / self.max_length)
+
     # Misc animation helpers
     def update_foreground(self):
+        if self.edge_layer is not None:
+            self.scene.add_foreground_mobjects(self.edge_layer)
+            return
         self.scene.add_foreground_mobjects(*(
             e.line_obj
             for e in self.all_edges
             if e.line_obj
         ))
 
-    def clean_edges(self):
-        for edge in self.all_edges:
+    def edge_side(self, edge: grid.Edge, from_v: grid.Vertex) -> int:
+        """FROM_START or FROM_END, the side of the edge from_v is on in an edge layer."""
+        if from_v not in (edge.v1, edge.v2):
+            raise ValueError('from_v must be an adjacent vertex.')
+        return FROM_START if from_v == edge.v1 else FROM_END
+
+    def edge_color(self, edge: grid.Edge):
+        """None for an edge that hasn't been drawn yet."""
+        if self.edge_layer is not None:
+            return self.edge_layer.slot_color(edge.id) if self.edge_layer.drawn[edge.id] else None
+        return edge.line_obj.get_color() if edge.line_obj else None
+
+    def draw_edge(self, edge: grid.Edge, from_v: grid.Vertex, color) -> Animation:
+        if self.edge_layer is None:
+            return edge.draw(direction=('f' if edge.v1 == from_v else 'b'), color=color)
+        return self.grow_edge_color(edge, color, from_v)
+
+    def grow_edge_color(self, edge: grid.Edge, color, from_v: grid.Vertex, **kwargs) -> Animation:
+        """Recolour the edge by growing color along it from its end at from_v."""
+        if self.edge_layer is None:
+            return edge.change_color(color, from_v=from_v, anim=True, **kwargs)
+        return GrowEdgeColor(self.edge_layer, [edge.id], color, sides=self.edge_side(edge, from_v), **kwargs)
+
+    def fade_edge_color(self, edge: grid.Edge, color, from_color, **kwargs) -> Animation:
+        """Fade the whole edge from from_color to color, hidden until it starts."""
+        if self.edge_layer is None:
+            anim_cls, args, anim_kwargs = edge.change_color(color, from_color=from_color, anim=True, class_mode=True)
+            anim_kwargs.update(kwargs)
+            return anim_cls(*args, **anim_kwargs)
+        return RecolorLayer(self.edge_layer, [edge.id], color, from_color=from_color, **kwargs)
+
+    def clean_edge(self, edge: grid.Edge):
+        """Settle the edge on its latest line before recolouring it again. Edge layers need no cleaning."""
+        if self.edge_layer is None:
+            edge.clean(self.scene)
+
+    def clean_edges(self, edges: Optional[Iterable[grid.Edge]] = None):
+        """
+        Clean the given edges, or every built edge. Called after playing, so lines the played animations
+        used can be recoloured again later.
+        """
+        if self.edge_layer is not None:
+            return
+        for edge in (self.all_edges if edges is None else edges):
             edge.clean(self.scene)
+            edge.recycle(self.scene)
 
 class TestScene(Scene):
 
@@ -263,12 +654,12 @@ class TestScene(Scene):
         a = VisualGrid('easy.map', self)
         self.play(*a.draw_vertices())
         a.search_init((1, 7), (3, 5))
-        self.play(*a.propogate_color_change(
+        self.play(Timeline(*a.propogate_color_change(
             a[1, 4], a.gen_neigbours((1, 4)), YELLOW,
             on_hit_color=GREEN,
             after_hit_color=PURPLE,
             at_once=False, push_to_iterable=True,
-        ))
+        )))
 
         a.clean_edges()
         a.update_foreground()
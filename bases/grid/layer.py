@@ -0,0 +1,96 @@
+"""
+All of a grid's cells as one mobject.
+
+Every cell is a slot, indexed by cell id, in a colour array, so recolouring any number of cells is one
+array assignment. A CellLayer draws cells sharing a colour together as one VMobject of squares, so the
+camera walks one mobject per colour on screen. A CellRaster draws them as pixels of one image, for maps
+too big for even that, and only rewrites the pixels of cells that changed.
+"""
+from typing import List, Tuple
+
+from big_ol_pile_of_manim_imports import *
+from manim_pathing.helpers import *
+
+
+class CellSquares(VMobject):
+    """Squares, four straight cubic curves each, every one its own closed subpath."""
+
+    CONFIG = {
+        'stroke_width': 0,
+        'fill_opacity': 1,
+    }
+
+    def get_subpaths_from_points(self, points):
+        nppcc = self.n_points_per_cubic_curve
+        return list(points.reshape(-1, 4 * nppcc, points.shape[-1]))
+
+
+class CellLayer(BatchedLayer, VGroup):
+
+    def __init__(self, shape: Tuple[int, int], length: float, margin: float, color=WHITE):
+        """Cells are placed and sized as grid.Vertex places its squares, length apart with margin either side."""
+        super().__init__()
+        height, width = shape
+        rows, cols = np.divmod(np.arange(height * width), width)
+        # Cell (x, y) is centred on (y * length, -x * length).
+        self.centers = np.stack([cols * length, -rows * length, np.zeros(height * width)], axis=1)
+        half = length * (1 - 2 * margin) / 2
+        corners = half * np.array([(-1, 1, 0), (1, 1, 0), (1, -1, 0), (-1, -1, 0), (-1, 1, 0)])
+        tails, heads = corners[:-1], corners[1:]
+        # One square about the origin, each side a cubic curve with its handles a third of the way along.
+        self.square_points = np.stack([tails, (2 * tails + heads) / 3, (tails + 2 * heads) / 3, heads], axis=1)
+        self.square_points = self.square_points.reshape(-1, 3)
+        self.rgbs = np.tile(as_rgb(color), (height * width, 1))
+        self.dirty = True
+
+    def refresh(self):
+        """Rebuild one submobject per colour from the cells, if any changed."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        codes, order, splits = group_by_key(rgb_codes(self.rgbs))
+        for index, (code, cells) in enumerate(zip(codes, np.split(order, splits))):
+            squares = self.style_group(index, CellSquares)
+            squares.points = (self.centers[cells, None, :] + self.square_points).reshape(-1, 3)
+            squares.set_fill(code_to_hex(code), opacity=1)
+        self.clear_groups(len(codes))
+
+
+class CellRaster(BatchedLayer, ImageMobject):
+
+    def __init__(self, shape: Tuple[int, int], length: float, pixels_per_cell=1, color=WHITE):
+        """Cells are placed as grid.Vertex places its squares, length apart, but drawn without margins."""
+        height, width = shape
+        pixels = np.zeros((height * pixels_per_cell, width * pixels_per_cell, 4), dtype=np.uint8)
+        pixels[:, :, 3] = 255
+        super().__init__(pixels)
+        self.grid_shape = shape
+        self.pixels_per_cell = pixels_per_cell
+        self.stretch_to_fit_width(width * length)
+        self.stretch_to_fit_height(height * length)
+        # Cell (x, y) is centred on (y * length, -x * length).
+        self.move_to(np.array([(width - 1) * length / 2, -(height - 1) * length / 2, 0]))
+        self.rgbs = np.tile(as_rgb(color), (height * width, 1))
+        # Cell ids changed since the last refresh, as one array per set_colors call.
+        self.dirty_cells: List[np.ndarray] = [np.arange(height * width)]
+        self.dirty = True
+
+    def set_colors(self, cells, color):
+        super().set_colors(cells, color)
+        if isinstance(cells, slice):
+            cells = np.arange(len(self.rgbs))[cells]
+        self.dirty_cells.append(np.asarray(cells, dtype=int).reshape(-1))
+
+    def refresh(self):
+        """Rewrite the pixels of the cells changed since the last refresh, leaving the rest as they are."""
+        if not self.dirty:
+            return
+        self.dirty = False
+        cells = np.unique(np.concatenate(self.dirty_cells))
+        self.dirty_cells = []
+        height, width = self.grid_shape
+        rows, cols = np.divmod(cells, width)
+        # A view with each cell's block of pixels on its own axes, so all of them are written at once.
+        blocks = self.pixel_array.reshape(height, self.pixels_per_cell, width, self.pixels_per_cell, 4)
+        rgb = np.round(np.clip(self.rgbs[cells], 0, 1) * 255).astype(np.uint8)
+        blocks[rows, :, cols, :, :3] = rgb[:, None, None, :]
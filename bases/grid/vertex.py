@@ -1,6 +1,64 @@
 from big_ol_pile_of_manim_imports import *
 import manim_pathing.bases.grid as grid
 
+class HeadlessVertex:
+    """Stand in for Vertex in a VisualGrid without a scene, the same cell and key but no mobject."""
+
+    def __init__(self, pos, cell=None):
+        self.pos = pos
+        self.cell = cell
+        self.key = f'({self.x}, {self.y})'
+        self.gridtype = None
+
+    def __str__(self):
+        return self.key
+
+    @property
+    def x(self):
+        return self.pos[0]
+
+    @property
+    def y(self):
+        return self.pos[1]
+
+    def set_gridtype(self, gridtype, anim=False):
+        self.gridtype = gridtype
+
+
+class LayerVertex(HeadlessVertex):
+    """
+    Stand in for Vertex in a VisualGrid drawing its cells into a layer. Nothing is kept per cell, one is
+    made each time the cell is looked up and equals any other for the same cell. Rings are throwaway squares.
+    """
+
+    def __eq__(self, other):
+        return isinstance(other, LayerVertex) and other.cell == self.cell
+
+    def __hash__(self):
+        return hash(self.cell)
+
+    def get_center(self) -> np.ndarray:
+        length = Vertex.VERTEX_CONFIG['length']
+        return np.array([self.y * length, -self.x * length, 0])
+
+    def get_update_ring(self, color=None, **kwargs):
+        square = Vertex(self.pos, cell=self.cell)
+        square.set_gridtype(self.gridtype)
+        return update_ring(square, color, **kwargs)
+
+
+def update_ring(square: 'Vertex', color=None, **kwargs) -> Animation:
+    """A ring flashing out from the cell, by growing and fading square, which is used up by it."""
+    if color is not None:
+        square.set_fill(color)
+    defaults = {
+        'scale_factor': 1.7,
+        'rate_func': rush_from,
+    }
+    defaults.update(kwargs)
+    return FadeOutToLarge(square, **defaults)
+
+
 class Vertex(Square):
 
     VERTEX_CONFIG = {
@@ -11,7 +69,7 @@ class Vertex(Square):
 
     SIDE_MARGIN = 0.05
 
-    def __init__(self, pos, **kwargs):
+    def __init__(self, pos, cell=None, **kwargs):
         new_kwargs = self.VERTEX_CONFIG
         new_kwargs.update(kwargs)
         length = new_kwargs['length']
@@ -19,6 +77,9 @@ class Vertex(Square):
         super().__init__(**new_kwargs)
         self.shift((RIGHT + DOWN) * length * self.SIDE_MARGIN)
         self.pos = pos
+        # Flat id of this square in its VisualGrid.
+        self.cell = cell
+        self.key = f'({self.x}, {self.y})'
         self.move_to(
             DOWN * self.x * length +
             RIGHT * self.y * length
@@ -28,10 +89,6 @@ class Vertex(Square):
     def __str__(self):
         return self.key
 
-    @property
-    def key(self):
-        return f'({self.x}, {self.y})'
-
     @property
     def x(self):
         return self.pos[0]
@@ -41,15 +98,7 @@ class Vertex(Square):
         return self.pos[1]
 
     def get_update_ring(self, color=None, **kwargs):
-        copy = self.copy()
-        if color is not None:
-            copy.set_fill(color)
-        defaults = {
-            'scale_factor': 1.7,
-            'rate_func': rush_from,
-        }
-        defaults.update(kwargs)
-        return FadeOutToLarge(copy, **defaults)
+        return update_ring(self.copy(), color, **kwargs)
 
     def set_gridtype(self, gridtype, anim=False):
         if self.gridtype == gridtype:
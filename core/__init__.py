@@ -0,0 +1,12 @@
+from manim_pathing.core.allpairs import AllPairs
+from manim_pathing.core.frontier import HeapFrontier, IndexedHeapFrontier, BucketFrontier, RadixFrontier, make_frontier
+from manim_pathing.core.graph import GraphCore
+from manim_pathing.core.grid import GridCore
+from manim_pathing.core.maps import MapRegistry, MAPS, parse_graph, load_octile
+from manim_pathing.core.search import (
+    BFSSearch, DijkstraSearch, AStarSearch, BidirectionalDijkstraSearch, FORWARD, BACKWARD,
+    GridBFSSearch, GridDijkstraSearch, GridAStarSearch, GridJPSSearch,
+)
+from manim_pathing.core.trace import (
+    Trace, TraceRecorder, TraceWriter, TraceFile, Event, expansions, EXPAND, DISCOVER, RELAX, FAIL_EDGE, SETTLE, PATH, EVENT_NAMES,
+)
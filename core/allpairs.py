@@ -0,0 +1,84 @@
+"""
+All-pairs shortest paths over a GraphCore.
+
+One Dijkstra per source fills in a distance and predecessor table, so every later (start, end) query
+on the same map is a lookup. Paths are walked back through the start's predecessor row, which makes
+them exactly the paths a DijkstraSearch from that start finds, ties included.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from manim_pathing.core.graph import GraphCore
+from manim_pathing.core.search import DijkstraSearch, _walk_back
+
+
+class AllPairs:
+
+    def __init__(self, distances: np.ndarray, predecessors: np.ndarray, next_hops: np.ndarray, integral: bool):
+        """distances[s, t] and predecessors[s, t] as a DijkstraSearch from s leaves them, next_hops[s, t] the vertex after s."""
+        self.distances = distances
+        self.predecessors = predecessors
+        self.next_hops = next_hops
+        self.integral = integral
+
+    @classmethod
+    def from_core(cls, core: GraphCore) -> 'AllPairs':
+        n = core.n_vertices
+        distances = np.full((n, n), np.inf)
+        predecessors = np.full((n, n), -1, dtype=np.int32)
+        for source in range(n):
+            search = DijkstraSearch(core, source).run()
+            distances[source] = search.distances
+            predecessors[source] = search.predecessors
+        return cls(
+            distances, predecessors, next_hops_from_predecessors(predecessors),
+            bool(np.issubdtype(core.weights.dtype, np.integer)),
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            'distances': self.distances,
+            'predecessors': self.predecessors,
+            'next_hops': self.next_hops,
+            'integral': np.array(self.integral),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'AllPairs':
+        return cls(arrays['distances'], arrays['predecessors'], arrays['next_hops'], bool(arrays['integral']))
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.distances)
+
+    def distance(self, source: int, target: int) -> float:
+        """inf if target can't be reached, an int on integer weighted maps otherwise."""
+        distance = self.distances[source, target]
+        return int(distance) if self.integral and distance != np.inf else float(distance)
+
+    def path(self, source: int, target: int) -> List[int]:
+        return _walk_back(self.predecessors[source].tolist(), source, target)
+
+    def next_hop(self, source: int, target: int) -> int:
+        """The vertex after source on its path to target, -1 if there is none."""
+        return int(self.next_hops[source, target])
+
+
+def next_hops_from_predecessors(predecessors: np.ndarray) -> np.ndarray:
+    """
+    Every target of every row points at its predecessor, or at itself once that predecessor is the row's
+    source, and the pointers are doubled until nothing moves. All rows go at once, and the number of
+    passes grows with the log of the deepest path's length.
+    """
+    n = len(predecessors)
+    sources = np.arange(n)[:, None]
+    targets = np.broadcast_to(np.arange(n, dtype=predecessors.dtype), (n, n))
+    hops = np.where((predecessors == sources) | (predecessors == -1), targets, predecessors)
+    while True:
+        further = np.take_along_axis(hops, hops, axis=1)
+        if np.array_equal(further, hops):
+            break
+        hops = further
+    hops[predecessors == -1] = -1
+    return hops
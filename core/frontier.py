@@ -0,0 +1,239 @@
+"""
+Priority queues for the core searches, holding integer vertex ids.
+
+Every frontier holds each id at most once: push inserts an id, or lowers its priority if it is already
+queued (and ignores a higher one). pop removes the lowest priority id and peek reads that priority.
+Only numbers are ever compared.
+"""
+import heapq
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Largest integer edge weight a bucket queue is picked for, beyond this it spends its time scanning empty buckets.
+BUCKET_LIMIT = 256
+
+
+class HeapFrontier:
+    """
+    heapq of (priority, id) pairs. Lowering a priority pushes a second entry, the old one is skipped when
+    it surfaces. Equal priorities pop in id order.
+    """
+
+    def __init__(self, n: int):
+        self.heap: List[Tuple[float, int]] = []
+        self.priority: List[Optional[float]] = [None] * n
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _drop_stale(self):
+        heap, priority = self.heap, self.priority
+        while priority[heap[0][1]] != heap[0][0]:
+            heapq.heappop(heap)
+
+    def peek(self) -> float:
+        self._drop_stale()
+        return self.heap[0][0]
+
+    def push(self, item: int, priority):
+        queued = self.priority[item]
+        if queued is None:
+            self.size += 1
+        elif queued <= priority:
+            return
+        self.priority[item] = priority
+        heapq.heappush(self.heap, (priority, item))
+
+    def pop(self) -> Tuple[float, int]:
+        self._drop_stale()
+        priority, item = heapq.heappop(self.heap)
+        self.priority[item] = None
+        self.size -= 1
+        return priority, item
+
+
+class IndexedHeapFrontier:
+    """
+    Binary heap indexed by id, so lowering a priority moves the existing entry (a true decrease-key)
+    and the heap never holds more than one entry per id. Equal priorities pop in id order.
+    """
+
+    def __init__(self, n: int):
+        self.heap: List[Tuple[float, int]] = []
+        self.position: List[int] = [-1] * n
+
+    def __len__(self):
+        return len(self.heap)
+
+    def peek(self) -> float:
+        return self.heap[0][0]
+
+    def push(self, item: int, priority):
+        index = self.position[item]
+        if index == -1:
+            index = len(self.heap)
+            self.heap.append((priority, item))
+        elif priority < self.heap[index][0]:
+            self.heap[index] = (priority, item)
+        else:
+            return
+        self._sift_up(index)
+
+    def pop(self) -> Tuple[float, int]:
+        heap, position = self.heap, self.position
+        top = heap[0]
+        position[top[1]] = -1
+        last = heap.pop()
+        if heap:
+            heap[0] = last
+            position[last[1]] = 0
+            self._sift_down(0)
+        return top
+
+    def _sift_up(self, index: int):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][1]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[1]] = index
+
+    def _sift_down(self, index: int):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][1]] = index
+            index = child
+        heap[index] = entry
+        position[entry[1]] = index
+
+
+class BucketFrontier:
+    """
+    Dial's bucket queue, for integer priorities that never fall behind the last pop and never lead it by
+    more than max_weight, which Dijkstra guarantees for integer edge weights up to max_weight.
+    Each bucket is a heapq of ids, so equal priorities still pop in id order. Lowered ids leave their old
+    entry behind to be skipped.
+    """
+
+    def __init__(self, n: int, max_weight: int):
+        self.buckets: List[List[int]] = [[] for _ in range(max_weight + 1)]
+        self.priority: List[Optional[int]] = [None] * n
+        self.current = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _advance(self):
+        buckets, priority = self.buckets, self.priority
+        while True:
+            bucket = buckets[self.current % len(buckets)]
+            while bucket and priority[bucket[0]] != self.current:
+                heapq.heappop(bucket)
+            if bucket:
+                return bucket
+            self.current += 1
+
+    def peek(self) -> int:
+        self._advance()
+        return self.current
+
+    def push(self, item: int, priority: int):
+        queued = self.priority[item]
+        if queued is None:
+            self.size += 1
+        elif queued <= priority:
+            return
+        self.priority[item] = priority
+        heapq.heappush(self.buckets[priority % len(self.buckets)], item)
+
+    def pop(self) -> Tuple[int, int]:
+        item = heapq.heappop(self._advance())
+        self.priority[item] = None
+        self.size -= 1
+        return self.current, item
+
+
+class RadixFrontier:
+    """
+    Radix heap for integer priorities that never fall behind the last pop. Entries sit in the bucket
+    numbered by the highest bit they differ from the last popped priority in, so each is moved at most
+    once per bit of the priority range.
+    """
+
+    def __init__(self, n: int):
+        self.buckets: List[List[Tuple[int, int]]] = [[] for _ in range(65)]
+        self.priority: List[Optional[int]] = [None] * n
+        self.last = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _refill(self) -> List[Tuple[int, int]]:
+        """Make the first bucket hold the lowest priority, returning it."""
+        buckets, priority = self.buckets, self.priority
+        first = buckets[0]
+        while first and priority[first[-1][1]] != first[-1][0]:
+            first.pop()
+        if first:
+            return first
+        for bucket in buckets[1:]:
+            live = [entry for entry in bucket if priority[entry[1]] == entry[0]]
+            bucket.clear()
+            if live:
+                break
+        self.last = last = min(live)[0]
+        for entry in live:
+            buckets[(entry[0] ^ last).bit_length()].append(entry)
+        return first
+
+    def peek(self) -> int:
+        return self._refill()[-1][0]
+
+    def push(self, item: int, priority: int):
+        queued = self.priority[item]
+        if queued is None:
+            self.size += 1
+        elif queued <= priority:
+            return
+        self.priority[item] = priority
+        self.buckets[(priority ^ self.last).bit_length()].append((priority, item))
+
+    def pop(self) -> Tuple[int, int]:
+        priority, item = self._refill().pop()
+        self.priority[item] = None
+        self.size -= 1
+        return priority, item
+
+
+def make_frontier(n: int, weights: Optional[np.ndarray] = None):
+    """
+    Pick a frontier for a Dijkstra search over arcs with these weights. Small non-negative integer weights
+    get a bucket queue, anything else (or no weights, as with a heuristic that may not keep priorities
+    integral) a heap. RadixFrontier and IndexedHeapFrontier are never picked, written in Python they
+    both lose to heapq, but either can be passed to a search directly.
+    """
+    if weights is None or not np.issubdtype(weights.dtype, np.integer) or not len(weights) or weights.min() < 0:
+        return HeapFrontier(n)
+    max_weight = int(weights.max())
+    if max_weight <= BUCKET_LIMIT:
+        return BucketFrontier(n, max_weight)
+    return HeapFrontier(n)
@@ -0,0 +1,114 @@
+"""
+Manim-free graph topology.
+
+Everything here is plain NumPy so searches can run on large graphs without ever touching a mobject.
+Vertices are addressed by integer id, ids follow the sorted order of the vertex keys so comparing ids
+breaks ties the same way comparing `Vertex.key` does.
+"""
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+class GraphCore:
+
+    def __init__(self, keys: Sequence[str], coords, edge_src, edge_dst, edge_weight=None, edge_directed=None):
+        """
+        keys/coords describe the vertices, edge_* the edge list (indices into keys).
+        Undirected edges appear once in the edge list and twice in the adjacency arrays.
+        """
+        keys = list(keys)
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        remap = np.empty(len(keys), dtype=np.int64)
+        remap[order] = np.arange(len(keys))
+
+        self.keys: List[str] = [keys[i] for i in order]
+        # Ids of the vertices in the order they were given, usually file order.
+        self.input_ids = remap
+        self.index: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+        self.coords = np.asarray(coords, dtype=np.float64).reshape(len(keys), -1)[order, :2]
+
+        n_edges = len(edge_src)
+        self.edge_src = remap[np.asarray(edge_src, dtype=np.int64)] if n_edges else np.zeros(0, dtype=np.int64)
+        self.edge_dst = remap[np.asarray(edge_dst, dtype=np.int64)] if n_edges else np.zeros(0, dtype=np.int64)
+        weights = np.ones(n_edges) if edge_weight is None else np.asarray(edge_weight, dtype=np.float64)
+        # Keep integer weights as integers, distances are shown to the viewer.
+        self.edge_weight = weights.astype(np.int64) if np.all(weights == np.round(weights)) else weights
+        self.edge_directed = (
+            np.zeros(n_edges, dtype=bool) if edge_directed is None
+            else np.asarray(edge_directed, dtype=bool)
+        )
+
+        self.offsets, self.targets, self.weights, self.edge_ids = self._build_csr(self.edge_src, self.edge_dst)
+        self.rev_offsets, self.rev_targets, self.rev_weights, self.rev_edge_ids = self._build_csr(self.edge_dst, self.edge_src)
+        self._lists = None
+
+    ARRAY_FIELDS = (
+        'coords', 'edge_src', 'edge_dst', 'edge_weight', 'edge_directed', 'input_ids',
+        'offsets', 'targets', 'weights', 'edge_ids',
+        'rev_offsets', 'rev_targets', 'rev_weights', 'rev_edge_ids',
+    )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {field: getattr(self, field) for field in self.ARRAY_FIELDS}
+        arrays['keys'] = np.array(self.keys, dtype=str)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays) -> 'GraphCore':
+        """Rebuild from to_arrays() output without redoing any sorting."""
+        core = cls.__new__(cls)
+        for field in cls.ARRAY_FIELDS:
+            setattr(core, field, arrays[field])
+        core.keys = arrays['keys'].tolist()
+        core.index = {key: i for i, key in enumerate(core.keys)}
+        core._lists = None
+        return core
+
+    def _build_csr(self, src, dst) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        both = ~self.edge_directed
+        ids = np.arange(len(src))
+        arc_src = np.concatenate([src, dst[both]])
+        arc_dst = np.concatenate([dst, src[both]])
+        arc_ids = np.concatenate([ids, ids[both]])
+        # Sort by source, then each source's targets in the order the vertices were given, which is the
+        # order VisualGraph lists neighbours in. Parallel arcs keep edge-list order.
+        positions = np.empty(self.n_vertices, dtype=np.int64)
+        positions[self.input_ids] = np.arange(self.n_vertices)
+        order = np.lexsort((arc_ids, positions[arc_dst], arc_src))
+        offsets = np.zeros(self.n_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(arc_src, minlength=self.n_vertices), out=offsets[1:])
+        return offsets, arc_dst[order], self.edge_weight[arc_ids[order]], arc_ids[order]
+
+    @property
+    def n_vertices(self) -> int:
+        return len(self.keys)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_src)
+
+    def degree(self, vertex: int) -> int:
+        return int(self.offsets[vertex + 1] - self.offsets[vertex])
+
+    def neighbours(self, vertex: int, reverse=False) -> np.ndarray:
+        if reverse:
+            return self.rev_targets[self.rev_offsets[vertex]:self.rev_offsets[vertex + 1]]
+        return self.targets[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def arc_weights(self, vertex: int, reverse=False) -> np.ndarray:
+        if reverse:
+            return self.rev_weights[self.rev_offsets[vertex]:self.rev_offsets[vertex + 1]]
+        return self.weights[self.offsets[vertex]:self.offsets[vertex + 1]]
+
+    def lists(self, reverse=False):
+        """Python list copies of the CSR arrays, scalar indexing into these is far cheaper than into ndarrays."""
+        if self._lists is None:
+            self._lists = {}
+        if reverse not in self._lists:
+            if reverse:
+                arrays = (self.rev_offsets, self.rev_targets, self.rev_weights)
+            else:
+                arrays = (self.offsets, self.targets, self.weights)
+            self._lists[reverse] = tuple(array.tolist() for array in arrays)
+        return self._lists[reverse]
@@ -0,0 +1,167 @@
+"""
+Manim-free grid state.
+
+Cells live in a flat uint8 array of cell types, traversability is kept alongside it as a bool array,
+so algorithms and renderers can read the whole map without any per-cell Python objects.
+Neighbours are precomputed per traversal method as one byte per cell, bit i set when the cell
+is joined to its neighbour in DIRECTIONS[i].
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+EMPTY, WALL, START, END = range(4)
+
+TRAVERSABLE = np.array([True, False, True, True])
+
+# Characters accepted in map bodies, MovingAI's terrain letters included.
+CELL_CHARS = {
+    EMPTY: '.GS',
+    WALL: 'wT@OW',
+    START: 's',
+    END: 'e',
+}
+
+UNKNOWN_CHAR = 255
+CHAR_CODES = np.full(256, UNKNOWN_CHAR, dtype=np.uint8)
+for _code, _chars in CELL_CHARS.items():
+    CHAR_CODES[np.frombuffer(_chars.encode(), dtype=np.uint8)] = _code
+
+
+TILES = 'tiles'
+OCTAL = 'octal'
+OCTAL_NO_CORNERS = 'octal_no_corners'
+# Every in-bounds neighbour, traversable or not.
+ALL_NEIGHBOURS = 'all'
+
+DIAG_DIST = round(np.sqrt(2), 4)
+
+# Cardinals first, then diagonals, the order VisualGrid has always listed neighbours in.
+DIRECTIONS: List[Tuple[int, int]] = [
+    (1, 0), (-1, 0), (0, 1), (0, -1),
+    (-1, -1), (-1, 1), (1, -1), (1, 1),
+]
+DIRECTION_BITS = {direction: 1 << i for i, direction in enumerate(DIRECTIONS)}
+DIRECTION_WEIGHTS = [1] * 4 + [float(DIAG_DIST)] * 4
+# Direction indices set in each possible mask.
+MASK_DIRECTIONS: List[List[int]] = [
+    [i for i in range(len(DIRECTIONS)) if mask >> i & 1]
+    for mask in range(256)
+]
+
+
+class GridCore:
+
+    def __init__(self, cells):
+        self.cells = np.array(cells, dtype=np.uint8)
+        self.traversable = TRAVERSABLE[self.cells]
+        self._masks: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_chars(cls, rows) -> 'GridCore':
+        raw = np.array([np.frombuffer(row.encode(), dtype=np.uint8) for row in rows])
+        return cls(decode_cells(raw))
+
+    @property
+    def height(self) -> int:
+        return self.cells.shape[0]
+
+    @property
+    def width(self) -> int:
+        return self.cells.shape[1]
+
+    @property
+    def n_vertices(self) -> int:
+        return self.cells.size
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    def set_cell(self, x: int, y: int, code: int):
+        changed = self.traversable[x, y] != TRAVERSABLE[code]
+        self.cells[x, y] = code
+        self.traversable[x, y] = TRAVERSABLE[code]
+        if changed:
+            # Only the 3x3 block around the cell can see it as a neighbour or corner.
+            rows = slice(max(0, x - 1), min(self.height, x + 2))
+            cols = slice(max(0, y - 1), min(self.width, y + 2))
+            for method, masks in self._masks.items():
+                masks[rows, cols] = self._compute_masks(method, rows, cols)
+
+    def neighbour_masks(self, method: str) -> np.ndarray:
+        """Neighbour bitmask of every cell under a traversal method, built once then kept up to date."""
+        if method not in self._masks:
+            self._masks[method] = self._compute_masks(method, slice(0, self.height), slice(0, self.width))
+        return self._masks[method]
+
+    def _compute_masks(self, method: str, rows: slice, cols: slice) -> np.ndarray:
+        # Pad the window by one cell so every direction is a plain shifted slice, cells outside the grid
+        # stay False. Only the window is copied, so refreshing a few cells costs as much as those cells.
+        n_rows, n_cols = rows.stop - rows.start, cols.stop - cols.start
+        padded = np.zeros((n_rows + 2, n_cols + 2), dtype=bool)
+        in_grid = np.zeros_like(padded)
+        row_lo, row_hi = max(0, rows.start - 1), min(self.height, rows.stop + 1)
+        col_lo, col_hi = max(0, cols.start - 1), min(self.width, cols.stop + 1)
+        inside = (
+            slice(row_lo - rows.start + 1, row_hi - rows.start + 1),
+            slice(col_lo - cols.start + 1, col_hi - cols.start + 1),
+        )
+        padded[inside] = True if method == ALL_NEIGHBOURS else self.traversable[row_lo:row_hi, col_lo:col_hi]
+        in_grid[inside] = True
+
+        def shifted(grid, x_change, y_change):
+            return grid[1 + x_change:1 + x_change + n_rows, 1 + y_change:1 + y_change + n_cols]
+
+        here = shifted(padded, 0, 0)
+        masks = np.zeros(here.shape, dtype=np.uint8)
+        for bit, (x_change, y_change) in enumerate(DIRECTIONS):
+            diagonal = x_change and y_change
+            if diagonal and method == TILES:
+                continue
+            if method == ALL_NEIGHBOURS:
+                joined = shifted(in_grid, x_change, y_change)
+            else:
+                joined = here & shifted(padded, x_change, y_change)
+            if diagonal and method == OCTAL_NO_CORNERS:
+                joined = joined & shifted(padded, x_change, 0) & shifted(padded, 0, y_change)
+            masks |= joined.astype(np.uint8) << bit
+        return masks
+
+    def neighbours(self, cell: int, method: str) -> List[Tuple[int, float]]:
+        """(cell, weight) for each neighbour of a flat cell id."""
+        width = self.width
+        mask = self.neighbour_masks(method).flat[cell]
+        return [
+            (cell + DIRECTIONS[i][0] * width + DIRECTIONS[i][1], DIRECTION_WEIGHTS[i])
+            for i in MASK_DIRECTIONS[mask]
+        ]
+
+    def joined(self, cell1: int, cell2: int, method: str) -> bool:
+        x1, y1 = divmod(cell1, self.width)
+        x2, y2 = divmod(cell2, self.width)
+        bit = DIRECTION_BITS.get((x2 - x1, y2 - y1))
+        return bit is not None and bool(self.neighbour_masks(method).flat[cell1] & bit)
+
+    def packed(self) -> np.ndarray:
+        """Traversability packed 8 cells per byte along each row."""
+        return np.packbits(self.traversable, axis=1)
+
+    def copy(self) -> 'GridCore':
+        return GridCore(self.cells)
+
+
+def octile_distance(x1, y1, x2, y2):
+    """Length of the shortest 8-connected path ignoring walls, works elementwise on arrays."""
+    diag = np.minimum(np.abs(x1 - x2), np.abs(y1 - y2))
+    horizontal = np.maximum(np.abs(x1 - x2), np.abs(y1 - y2)) - diag
+    return horizontal + diag * DIAG_DIST
+
+
+def decode_cells(raw: np.ndarray) -> np.ndarray:
+    """Map raw map bytes to cell types in one table lookup."""
+    cells = CHAR_CODES[raw]
+    if (cells == UNKNOWN_CHAR).any():
+        bad = sorted(set(bytes(raw[cells == UNKNOWN_CHAR].tolist()).decode(errors='replace')))
+        raise ValueError(f'Unknown map characters: {bad}')
+    return cells
@@ -0,0 +1,190 @@
+"""
+Finding, parsing and caching map files.
+
+Parsed maps are kept in memory (keyed by path and mtime) and compiled to `.npz` on disk (keyed by a
+hash of the file contents), so re-rendering a scene never re-parses a map that hasn't changed.
+All-pairs tables for graph maps are cached the same way.
+"""
+import hashlib
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from manim_pathing.core.allpairs import AllPairs
+from manim_pathing.core.graph import GraphCore
+from manim_pathing.core.grid import GridCore, decode_cells
+
+PACKAGE_MAP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'maps')
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'manim_pathing')
+
+
+# One pattern for both line kinds so every line is scanned once.
+graph_line_matcher = re.compile(
+    r'^[^\S\n]*(?:'
+    r'(?P<key>\S+), \((?P<x>\S+), (?P<y>\S+)\)'
+    r'|'
+    r'(?P<key1>\S+) (?P<direction>(>|<|-))(?P<weight>((\S+)|-|>|<))(>|<|-) (?P<key2>\S+)'
+    r')',
+    re.MULTILINE,
+)
+
+
+def parse_graph(text: str) -> GraphCore:
+    """Parse the contents of a `.graph` file."""
+    keys: List[str] = []
+    coords: List[Tuple[float, float]] = []
+    edges: List[Tuple[str, str, float, bool]] = []
+    for match in graph_line_matcher.finditer(text):
+        info = match.groupdict()
+        if info['key'] is not None:
+            keys.append(info['key'])
+            coords.append((float(info['x']), float(info['y'])))
+            continue
+        weight = float(info['weight']) if info['weight'].isnumeric() else 1
+        if info['direction'] == '<':
+            edges.append((info['key2'], info['key1'], weight, True))
+        else:
+            edges.append((info['key1'], info['key2'], weight, info['direction'] == '>'))
+    index = {key: i for i, key in enumerate(keys)}
+    return GraphCore(
+        keys,
+        np.array(coords, dtype=np.float64).reshape(-1, 2),
+        [index[edge[0]] for edge in edges],
+        [index[edge[1]] for edge in edges],
+        [edge[2] for edge in edges],
+        [edge[3] for edge in edges],
+    )
+
+
+def load_octile(path: str) -> GridCore:
+    """
+    Load a MovingAI `type octile` map. Only the header and first row are read as text,
+    the body is memory mapped and decoded with a single table lookup.
+    The shape comes from the body itself, hand written maps don't always keep their header up to date.
+    """
+    header = {}
+    offset = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            offset += len(line)
+            words = line.decode().split()
+            if words and words[0] == 'map':
+                break
+            if len(words) == 2:
+                header[words[0]] = words[1]
+        else:
+            raise ValueError(f'{path} has no map section.')
+        first_row = f.readline()
+    if header.get('type', 'octile') != 'octile':
+        raise ValueError(f'{path} is a {header["type"]} map, only octile maps are supported.')
+    width = len(first_row.rstrip(b'\r\n'))
+    if width == 0:
+        return GridCore(np.zeros((0, 0), dtype=np.uint8))
+    newline = len(first_row) - width or 1
+
+    body = np.memmap(path, dtype=np.uint8, mode='r', offset=offset)
+    stride = width + newline
+    # The last row may or may not end in a newline, trailing blank lines are ignored.
+    height = (len(body) + newline) // stride
+    # Rows are `stride` apart, the newlines are simply stepped over.
+    raw = np.lib.stride_tricks.as_strided(body, shape=(height, width), strides=(stride, 1), writeable=False)
+    return GridCore(decode_cells(raw))
+
+
+class MapRegistry:
+
+    COMPILED_VERSION = 2
+
+    def __init__(self, search_paths: Optional[List[str]] = None, cache_dir: Optional[str] = None):
+        if search_paths is None:
+            search_paths = [
+                path for path in os.environ.get('MANIM_PATHING_MAPS', '').split(os.pathsep) if path
+            ] + [
+                'manim_pathing/maps/',
+                PACKAGE_MAP_DIR,
+            ]
+        self.search_paths: List[str] = list(search_paths)
+        self.cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+        self._loaded: Dict[Tuple[str, str, int, int], object] = {}
+
+    def add_search_path(self, path: str, first=True):
+        if first:
+            self.search_paths.insert(0, path)
+        else:
+            self.search_paths.append(path)
+
+    def find(self, filename: str) -> str:
+        if os.path.isabs(filename) and os.path.isfile(filename):
+            return filename
+        for directory in self.search_paths:
+            path = os.path.join(directory, filename)
+            if os.path.isfile(path):
+                return os.path.abspath(path)
+        raise FileNotFoundError(f'Map {filename} not found in any of {self.search_paths}.')
+
+    def load_graph(self, filename: str) -> GraphCore:
+        return self._load(filename, 'graph', parse_graph, GraphCore.from_arrays)
+
+    def load_all_pairs(self, filename: str) -> AllPairs:
+        """Distance and next hop tables between every pair of vertices of a graph map, slow to build the first time."""
+        return self._load(filename, 'all-pairs', lambda text: AllPairs.from_core(self.load_graph(filename)), AllPairs.from_arrays)
+
+    def load_grid(self, filename: str) -> GridCore:
+        """Shared between callers, copy() before changing any cells."""
+        path, memory_key = self._memory_key(filename, 'grid')
+        if memory_key not in self._loaded:
+            self._remember(memory_key, load_octile(path))
+        return self._loaded[memory_key]
+
+    def _memory_key(self, filename, kind):
+        path = self.find(filename)
+        stat = os.stat(path)
+        return path, (path, kind, stat.st_mtime_ns, stat.st_size)
+
+    def _remember(self, memory_key, result):
+        # An edited map replaces its old entry rather than piling up beside it.
+        for key in [key for key in self._loaded if key[:2] == memory_key[:2]]:
+            del self._loaded[key]
+        self._loaded[memory_key] = result
+
+    def _load(self, filename, kind, parse, from_arrays):
+        path, memory_key = self._memory_key(filename, kind)
+        if memory_key in self._loaded:
+            return self._loaded[memory_key]
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        compiled = os.path.join(
+            self.cache_dir,
+            f'{os.path.basename(path)}-{kind}-v{self.COMPILED_VERSION}-{digest[:20]}.npz',
+        )
+        result = None
+        if os.path.isfile(compiled):
+            try:
+                with np.load(compiled, allow_pickle=False) as arrays:
+                    result = from_arrays(arrays)
+            except (OSError, ValueError, KeyError):
+                result = None
+        if result is None:
+            result = parse(raw.decode())
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                # Write then rename so a concurrent render never reads half a file.
+                tmp_path = f'{compiled}.{os.getpid()}.tmp.npz'
+                np.savez(tmp_path, **result.to_arrays())
+                os.replace(tmp_path, compiled)
+            except OSError:
+                pass
+
+        self._remember(memory_key, result)
+        return result
+
+
+MAPS = MapRegistry()
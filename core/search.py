@@ -0,0 +1,487 @@
+"""
+Manim-free searches over a GraphCore.
+
+Each search can be stepped, returning what happened so the animation layer can draw it, or run to
+completion in one call when only the result is needed.
+"""
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from manim_pathing.core.frontier import HeapFrontier, make_frontier
+from manim_pathing.core.graph import GraphCore
+from manim_pathing.core.grid import (
+    DIRECTIONS, DIRECTION_WEIGHTS, MASK_DIRECTIONS, OCTAL_NO_CORNERS, GridCore, octile_distance,
+)
+
+# (expanded vertex, vertices reached successfully, neighbours that were rejected)
+Expansion = Tuple[int, List[int], List[int]]
+
+
+class BFSSearch:
+
+    def __init__(self, core: GraphCore, source: int, target: Optional[int] = None):
+        self.core = core
+        self.source = source
+        self.target = target
+        self.layer = 0
+        self.distances = np.full(core.n_vertices, -1, dtype=np.int64)
+        self.predecessors = np.full(core.n_vertices, -1, dtype=np.int64)
+        self.distances[source] = 0
+        self.frontier = np.array([source], dtype=np.int64)
+
+    @property
+    def done(self) -> bool:
+        if not len(self.frontier):
+            return True
+        return self.target is not None and self.predecessors[self.target] != -1
+
+    def _arcs(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Number of arcs leaving each frontier vertex, and all their targets laid end to end."""
+        offsets = self.core.offsets
+        starts = offsets[frontier]
+        counts = offsets[frontier + 1] - starts
+        arcs = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return counts, self.core.targets[arcs]
+
+    def _expand_layer(self):
+        """Expand the whole frontier at once. The first arc (in frontier, then adjacency order) to reach a vertex wins."""
+        counts, targets = self._arcs(self.frontier)
+        owners = np.repeat(np.arange(len(self.frontier)), counts)
+        unseen = np.flatnonzero(self.distances[targets] == -1)
+        _, first = np.unique(targets[unseen], return_index=True)
+        success = np.zeros(len(targets), dtype=bool)
+        success[unseen[np.sort(first)]] = True
+
+        self.layer += 1
+        found = targets[success]
+        self.distances[found] = self.layer
+        self.predecessors[found] = self.frontier[owners[success]]
+        return counts, targets, success
+
+    def step(self) -> List[Expansion]:
+        """Expand one BFS layer."""
+        frontier = self.frontier
+        counts, targets, success = self._expand_layer()
+        self.frontier = targets[success]
+        expansions = []
+        for vertex, vert_targets, vert_success in zip(
+            frontier.tolist(),
+            np.split(targets, np.cumsum(counts)[:-1]),
+            np.split(success, np.cumsum(counts)[:-1]),
+        ):
+            expansions.append((vertex, vert_targets[vert_success].tolist(), vert_targets[~vert_success].tolist()))
+        return expansions
+
+    def run(self):
+        while not self.done:
+            counts, targets, success = self._expand_layer()
+            self.frontier = targets[success]
+        return self
+
+    def path(self, target: Optional[int] = None) -> List[int]:
+        return _walk_back(self.predecessors, self.source, self.target if target is None else target)
+
+
+class DijkstraSearch:
+
+    def __init__(self, core: GraphCore, source: int, target: Optional[int] = None, heuristic=None, reverse=False, frontier=None):
+        """
+        heuristic, if given, is a per vertex lower bound on the distance to target (making this A*).
+        reverse searches along edges backwards, giving distances *to* source.
+        frontier defaults to the best fit for the graph's weights, see make_frontier.
+        """
+        self.core = core
+        self.source = source
+        self.target = target
+        self.reverse = reverse
+        self.distances: List[float] = [float('inf')] * core.n_vertices
+        self.predecessors: List[int] = [-1] * core.n_vertices
+        self.expanded: List[bool] = [False] * core.n_vertices
+        # Vertices in the order step() or run() settled them.
+        self.settled: List[int] = []
+        self.heuristic = [0] * core.n_vertices if heuristic is None else list(heuristic)
+        self.distances[source] = 0
+        if frontier is None:
+            frontier = make_frontier(core.n_vertices, core.weights if heuristic is None else None)
+        self.frontier = frontier
+        self.frontier.push(source, self.heuristic[source])
+
+    @property
+    def done(self) -> bool:
+        if not self.frontier:
+            return True
+        return self.target is not None and self.expanded[self.target]
+
+    @property
+    def n_expanded(self) -> int:
+        return sum(self.expanded)
+
+    def _arcs_of(self, vertex: int):
+        """(target, weight) pairs leaving a vertex."""
+        offsets, targets, weights = self.core.lists(self.reverse)
+        start, stop = offsets[vertex], offsets[vertex + 1]
+        return zip(targets[start:stop], weights[start:stop])
+
+    def step(self) -> Expansion:
+        """Settle the closest unexpanded vertex."""
+        _, vertex = self.frontier.pop()
+        distance = self.distances[vertex]
+        success, rejected = [], []
+        for end, weight in self._arcs_of(vertex):
+            new_distance = distance + weight
+            if not self.expanded[end] and self.distances[end] > new_distance:
+                self.distances[end] = new_distance
+                self.predecessors[end] = vertex
+                self.frontier.push(end, new_distance + self.heuristic[end])
+                success.append(end)
+            else:
+                rejected.append(end)
+        self.expanded[vertex] = True
+        self.settled.append(vertex)
+        return vertex, success, rejected
+
+    def run(self):
+        distances, predecessors, expanded = self.distances, self.predecessors, self.expanded
+        frontier, heuristic, arcs_of = self.frontier, self.heuristic, self._arcs_of
+        push, pop, settle = frontier.push, frontier.pop, self.settled.append
+        while frontier:
+            _, vertex = pop()
+            expanded[vertex] = True
+            settle(vertex)
+            distance = distances[vertex]
+            for end, weight in arcs_of(vertex):
+                new_distance = distance + weight
+                if not expanded[end] and distances[end] > new_distance:
+                    distances[end] = new_distance
+                    predecessors[end] = vertex
+                    push(end, new_distance + heuristic[end])
+            if vertex == self.target:
+                break
+        return self
+
+    def path(self, target: Optional[int] = None) -> List[int]:
+        return _walk_back(self.predecessors, self.source, self.target if target is None else target)
+
+    def stopped_at(self, target: int) -> 'DijkstraSearch':
+        """
+        From a search run over the whole graph, the search from the same source that stopped at target,
+        as its run() leaves it: the vertices settled up to target, and their unexpanded neighbours with the
+        distance and predecessor of the first arc to reach them at their best. Those neighbours are back in
+        a heap frontier, so it can be stepped further, though ties may pop in another order.
+        """
+        n_settled = self.settled.index(target) + 1 if self.expanded[target] else len(self.settled)
+        settled = self.settled[:n_settled]
+        search = DijkstraSearch(self.core, self.source, target, reverse=self.reverse, frontier=HeapFrontier(self.core.n_vertices))
+        search.frontier.pop()
+        search.settled = settled
+        for vertex in settled:
+            search.expanded[vertex] = True
+            search.distances[vertex] = self.distances[vertex]
+            search.predecessors[vertex] = self.predecessors[vertex]
+
+        core = self.core
+        offsets, targets, weights = (
+            (core.rev_offsets, core.rev_targets, core.rev_weights) if self.reverse else
+            (core.offsets, core.targets, core.weights)
+        )
+        # Every arc leaving a settled vertex, in settle then adjacency order, as run() relaxed them.
+        owners = np.array(settled, dtype=np.int64)
+        starts = offsets[owners]
+        counts = offsets[owners + 1] - starts
+        arcs = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        ends = targets[arcs]
+        reached = np.repeat(np.array([self.distances[vertex] for vertex in settled]), counts) + weights[arcs]
+        owners = np.repeat(owners, counts)
+        unexpanded = ~np.isin(ends, settled)
+        ends, reached, owners = ends[unexpanded], reached[unexpanded], owners[unexpanded]
+        # lexsort is stable, so each end's first arc at its least distance comes first, later ties never replace it.
+        order = np.lexsort((reached, ends))
+        first = order[np.r_[True, ends[order][1:] != ends[order][:-1]]] if len(order) else order
+        for end, distance, owner in zip(ends[first].tolist(), reached[first].tolist(), owners[first].tolist()):
+            search.distances[end] = distance
+            search.predecessors[end] = owner
+            search.frontier.push(end, distance)
+        return search
+
+
+class AStarSearch(DijkstraSearch):
+    """
+    Dijkstra guided by straight line distance to the target. Distance is scaled by the smallest
+    weight per unit length of any edge, so the estimate never exceeds the true cost.
+    """
+
+    def __init__(self, core: GraphCore, source: int, target: int):
+        super().__init__(core, source, target, heuristic=straight_line_heuristic(core, target).tolist())
+
+
+def straight_line_heuristic(core: GraphCore, target: int) -> np.ndarray:
+    lengths = np.linalg.norm(core.coords[core.edge_src] - core.coords[core.edge_dst], axis=1)
+    has_length = lengths > 0
+    if not has_length.any():
+        return np.zeros(core.n_vertices)
+    scale = max(0, np.min(core.edge_weight[has_length] / lengths[has_length]))
+    return scale * np.linalg.norm(core.coords - core.coords[target], axis=1)
+
+
+FORWARD, BACKWARD = 0, 1
+
+
+class BidirectionalDijkstraSearch:
+    """
+    Dijkstra grown from both source and target, the backward half following edges in reverse.
+    Each step expands whichever frontier is closer. The best source -> target distance seen through any
+    relaxed arc is kept, and the search stops once the two frontiers together can't beat it.
+    """
+
+    def __init__(self, core: GraphCore, source: int, target: int):
+        self.core = core
+        self.source = source
+        self.target = target
+        self.sides = (DijkstraSearch(core, source), DijkstraSearch(core, target, reverse=True))
+        self.distance = 0 if source == target else float('inf')
+        # (forward side vertex, backward side vertex) of the arc the best path crosses.
+        self.meeting: Optional[Tuple[int, int]] = (source, target) if source == target else None
+
+    @property
+    def done(self) -> bool:
+        forward, backward = self.sides
+        if not forward.frontier or not backward.frontier:
+            return True
+        return forward.frontier.peek() + backward.frontier.peek() >= self.distance
+
+    @property
+    def n_expanded(self) -> int:
+        return sum(side.n_expanded for side in self.sides)
+
+    @property
+    def next_direction(self) -> int:
+        forward, backward = self.sides
+        return FORWARD if forward.frontier.peek() <= backward.frontier.peek() else BACKWARD
+
+    def step(self) -> Tuple[int, Expansion]:
+        """Expand the closer frontier, returning which direction moved along with its expansion."""
+        direction = self.next_direction
+        side, other = self.sides[direction], self.sides[1 - direction]
+        vertex, success, rejected = side.step()
+        distance = side.distances[vertex]
+        for end, weight in side._arcs_of(vertex):
+            through = distance + weight + other.distances[end]
+            if through < self.distance:
+                self.distance = through
+                self.meeting = (vertex, end) if direction == FORWARD else (end, vertex)
+        return direction, (vertex, success, rejected)
+
+    def run(self):
+        sides = self.sides
+        frontiers = [side.frontier for side in sides]
+        distances = [side.distances for side in sides]
+        expanded = [side.expanded for side in sides]
+        arcs = [side.core.lists(side.reverse) for side in sides]
+        best, meeting = self.distance, self.meeting
+        forward, backward = frontiers
+        while forward and backward:
+            forward_min, backward_min = forward.peek(), backward.peek()
+            if forward_min + backward_min >= best:
+                break
+            direction = FORWARD if forward_min <= backward_min else BACKWARD
+            frontier, dist, done = frontiers[direction], distances[direction], expanded[direction]
+            other_dist = distances[1 - direction]
+            predecessors = sides[direction].predecessors
+            offsets, targets, weights = arcs[direction]
+            distance, vertex = frontier.pop()
+            done[vertex] = True
+            for i in range(offsets[vertex], offsets[vertex + 1]):
+                end = targets[i]
+                new_distance = distance + weights[i]
+                if not done[end] and dist[end] > new_distance:
+                    dist[end] = new_distance
+                    predecessors[end] = vertex
+                    frontier.push(end, new_distance)
+                through = new_distance + other_dist[end]
+                if through < best:
+                    best = through
+                    meeting = (vertex, end) if direction == FORWARD else (end, vertex)
+        self.distance, self.meeting = best, meeting
+        return self
+
+    def path(self) -> List[int]:
+        if self.meeting is None:
+            return []
+        forward, backward = self.sides
+        middle, end = self.meeting
+        path = _walk_back(forward.predecessors, self.source, middle)
+        if middle != end:
+            path.extend(_walk_back(backward.predecessors, self.target, end)[::-1])
+        return path
+
+
+# Searches over GridCore cells, vertices here are flat cell ids.
+
+class GridBFSSearch(BFSSearch):
+
+    def __init__(self, core: GridCore, source: int, target: Optional[int] = None, method: str = None):
+        super().__init__(core, source, target)
+        self.method = method
+        self.cell_offsets = np.array([x * core.width + y for x, y in DIRECTIONS], dtype=np.int64)
+        self.bits = np.arange(len(DIRECTIONS), dtype=np.uint8)
+
+    def _arcs(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        masks = self.core.neighbour_masks(self.method).ravel()[frontier]
+        joined = (masks[:, None] >> self.bits) & 1 == 1
+        targets = frontier[:, None] + self.cell_offsets
+        return joined.sum(axis=1), targets[joined]
+
+
+class GridDijkstraSearch(DijkstraSearch):
+
+    def __init__(self, core: GridCore, source: int, target: Optional[int] = None, method: str = None, heuristic=None):
+        super().__init__(core, source, target, heuristic=heuristic, frontier=HeapFrontier(core.n_vertices))
+        self.method = method
+        self.masks = core.neighbour_masks(method).ravel().tolist()
+        self.arc_lists = [
+            [(core.width * DIRECTIONS[i][0] + DIRECTIONS[i][1], DIRECTION_WEIGHTS[i]) for i in directions]
+            for directions in MASK_DIRECTIONS
+        ]
+
+    def _arcs_of(self, vertex: int):
+        return [(vertex + offset, weight) for offset, weight in self.arc_lists[self.masks[vertex]]]
+
+
+class GridAStarSearch(GridDijkstraSearch):
+    """Dijkstra guided by the octile distance to the target."""
+
+    def __init__(self, core: GridCore, source: int, target: int, method: str = None):
+        x, y = np.divmod(np.arange(core.n_vertices), core.width)
+        target_x, target_y = divmod(target, core.width)
+        heuristic = octile_distance(x, y, target_x, target_y).tolist()
+        super().__init__(core, source, target, method=method, heuristic=heuristic)
+
+
+def _walk_back(predecessors, source: int, target: int) -> List[int]:
+    """Follow predecessors from target back to source. Empty if target was never reached."""
+    if target != source and predecessors[target] == -1:
+        return []
+    path = [target]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
+
+
+class GridJPSSearch(GridAStarSearch):
+    """
+    Jump Point Search, A* that only ever pushes jump points. Diagonal moves need both cardinal neighbours
+    free (OCTAL_NO_CORNERS), following the no-obstacle variant of Harabor and Grastien's pruning rules.
+    """
+
+    def __init__(self, core: GridCore, source: int, target: int):
+        super().__init__(core, source, target, method=OCTAL_NO_CORNERS)
+        # Walls around the edge remove every bounds check, (x, y) lives at (x + 1) * stride + y + 1.
+        padded = np.zeros((core.height + 2, core.width + 2), dtype=bool)
+        padded[1:-1, 1:-1] = core.traversable
+        self.stride = core.width + 2
+        self.open = padded.ravel().tolist()
+        self.target_xy = divmod(target, core.width)
+
+    def _free(self, x, y) -> bool:
+        return self.open[(x + 1) * self.stride + y + 1]
+
+    def _arcs_of(self, vertex: int):
+        x, y = divmod(vertex, self.core.width)
+        arcs = []
+        for x_change, y_change in self._directions(vertex, x, y):
+            jump = self._jump(x + x_change, y + y_change, x_change, y_change)
+            if jump is not None:
+                arcs.append((jump[0] * self.core.width + jump[1], float(octile_distance(x, y, *jump))))
+        return arcs
+
+    def _directions(self, vertex, x, y):
+        """Directions worth jumping in, given the direction we arrived from."""
+        free = self._free
+        parent = self.predecessors[vertex]
+        if parent == -1:
+            return [
+                direction for direction in DIRECTIONS
+                if free(x + direction[0], y + direction[1]) and (
+                    not (direction[0] and direction[1]) or
+                    (free(x + direction[0], y) and free(x, y + direction[1]))
+                )
+            ]
+        parent_x, parent_y = divmod(parent, self.core.width)
+        x_change, y_change = int(np.sign(x - parent_x)), int(np.sign(y - parent_y))
+        directions = []
+        if x_change and y_change:
+            if free(x, y + y_change):
+                directions.append((0, y_change))
+            if free(x + x_change, y):
+                directions.append((x_change, 0))
+            if free(x, y + y_change) and free(x + x_change, y):
+                directions.append((x_change, y_change))
+        elif x_change:
+            ahead = free(x + x_change, y)
+            for side in (1, -1):
+                if free(x, y + side):
+                    if ahead:
+                        directions.append((x_change, side))
+                    directions.append((0, side))
+            if ahead:
+                directions.append((x_change, 0))
+        else:
+            ahead = free(x, y + y_change)
+            for side in (1, -1):
+                if free(x + side, y):
+                    if ahead:
+                        directions.append((side, y_change))
+                    directions.append((side, 0))
+            if ahead:
+                directions.append((0, y_change))
+        return directions
+
+    def _jump_straight(self, x, y, x_change, y_change):
+        free = self._free
+        while free(x, y):
+            if (x, y) == self.target_xy:
+                return x, y
+            # A wall beside us that has just ended means a forced neighbour.
+            if x_change and (
+                (free(x, y - 1) and not free(x - x_change, y - 1)) or
+                (free(x, y + 1) and not free(x - x_change, y + 1))
+            ):
+                return x, y
+            if y_change and (
+                (free(x - 1, y) and not free(x - 1, y - y_change)) or
+                (free(x + 1, y) and not free(x + 1, y - y_change))
+            ):
+                return x, y
+            x, y = x + x_change, y + y_change
+        return None
+
+    def _jump(self, x, y, x_change, y_change):
+        """First jump point reached moving from (x, y) in a direction, or None."""
+        if not (x_change and y_change):
+            return self._jump_straight(x, y, x_change, y_change)
+        free = self._free
+        while free(x, y):
+            if (x, y) == self.target_xy:
+                return x, y
+            if (
+                self._jump_straight(x + x_change, y, x_change, 0) is not None or
+                self._jump_straight(x, y + y_change, 0, y_change) is not None
+            ):
+                return x, y
+            if not (free(x + x_change, y) and free(x, y + y_change)):
+                return None
+            x, y = x + x_change, y + y_change
+        return None
+
+    def cell_path(self, target: Optional[int] = None) -> List[int]:
+        """path() with the straight runs between jump points filled back in."""
+        jump_points = self.path(target)
+        width = self.core.width
+        cells = jump_points[:1]
+        for start, end in zip(jump_points[:-1], jump_points[1:]):
+            (x1, y1), (x2, y2) = divmod(start, width), divmod(end, width)
+            x_change, y_change = int(np.sign(x2 - x1)), int(np.sign(y2 - y1))
+            for i in range(1, max(abs(x2 - x1), abs(y2 - y1)) + 1):
+                cells.append((x1 + i * x_change) * width + y1 + i * y_change)
+        return cells
@@ -0,0 +1,287 @@
+"""
+Search traces: what a core search did, as an ordered list of small events.
+
+A TraceRecorder steps a search and writes its trace as it goes. The animation layer only ever reads
+events, so a trace can be recorded once (headless, or on another machine) and played back as often
+as the animation style changes, without searching again.
+"""
+import os
+from typing import Iterator, List, NamedTuple, Tuple
+
+import numpy as np
+
+from manim_pathing.core.search import BFSSearch, BidirectionalDijkstraSearch, FORWARD, BACKWARD
+
+EXPAND, DISCOVER, RELAX, FAIL_EDGE, SETTLE, PATH = range(6)
+
+EVENT_NAMES = ('expand', 'discover', 'relax', 'fail-edge', 'settle', 'path')
+
+
+class Event(NamedTuple):
+    """
+    kind is one of the constants above, step the search step it happened in (0 for PATH).
+    EXPAND and SETTLE: vertex, the direction it was expanded in (always FORWARD outside bidirectional
+    searches) and its distance. DISCOVER, RELAX and FAIL_EDGE: the arc vertex -> other and the distance
+    other holds afterwards. PATH: each vertex on the path in order, the direction whose search reached
+    it, and its distance along the path.
+    """
+    kind: int
+    step: int
+    vertex: int
+    other: int
+    value: float
+
+
+# Expanded vertex, its direction, (vertex, distance) pairs reached through it, vertices rejected.
+StepExpansion = Tuple[int, int, List[Tuple[int, float]], List[int]]
+
+
+class Trace:
+    """Events kept column by column, so a long trace costs a few flat lists rather than a tuple per event."""
+
+    COLUMNS = Event._fields
+
+    def __init__(self):
+        self.kinds: List[int] = []
+        self.step_numbers: List[int] = []
+        self.vertices: List[int] = []
+        self.others: List[int] = []
+        self.values: List[float] = []
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index) -> Event:
+        return Event(self.kinds[index], self.step_numbers[index], self.vertices[index], self.others[index], self.values[index])
+
+    def __iter__(self) -> Iterator[Event]:
+        return map(Event, self.kinds, self.step_numbers, self.vertices, self.others, self.values)
+
+    def append(self, kind: int, step: int, vertex: int, other: int, value: float):
+        self.kinds.append(kind)
+        self.step_numbers.append(step)
+        self.vertices.append(int(vertex))
+        self.others.append(int(other))
+        self.values.append(value)
+
+    def steps(self) -> Iterator[List[Event]]:
+        """Events grouped by the search step that produced them, path events left out."""
+        step, events = None, []
+        for event in self:
+            if event.kind == PATH:
+                continue
+            if event.step != step and events:
+                yield events
+                events = []
+            step = event.step
+            events.append(event)
+        if events:
+            yield events
+
+    def path_events(self) -> List[Event]:
+        return [event for event in self if event.kind == PATH]
+
+    def path(self) -> List[int]:
+        return [event.vertex for event in self.path_events()]
+
+
+# On disk a trace is MAGIC followed by fixed size little endian records, written a chunk at a time.
+TRACE_MAGIC = b'MPTRACE1'
+RECORD_DTYPE = np.dtype([
+    ('kind', '<u1'),
+    ('step', '<u4'),
+    ('vertex', '<i4'),
+    ('other', '<i4'),
+    ('value', '<f8'),
+])
+# Set on kind when value was an int, so integer distances come back as ints.
+INT_VALUE = 0x80
+KIND_MASK = 0x7f
+CHUNK_EVENTS = 1 << 16
+
+
+class TraceWriter:
+    """Appends events to a trace file, holding at most CHUNK_EVENTS of them in memory."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.file = open(filename, 'wb')
+        self.file.write(TRACE_MAGIC)
+        self.buffer: List[Tuple[int, int, int, int, float]] = []
+        self.n_events = 0
+
+    def __len__(self):
+        return self.n_events
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def append(self, kind: int, step: int, vertex: int, other: int, value: float):
+        if type(value) is int:
+            kind |= INT_VALUE
+        self.buffer.append((kind, step, vertex, other, value))
+        self.n_events += 1
+        if len(self.buffer) >= CHUNK_EVENTS:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            np.array(self.buffer, dtype=RECORD_DTYPE).tofile(self.file)
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+
+class TraceFile(Trace):
+    """
+    A trace file written by TraceWriter, read through a memory map a chunk at a time, so playing
+    back even a very long search keeps memory flat. Works anywhere a Trace does, other than appending.
+    """
+
+    def __init__(self, filename: str):
+        with open(filename, 'rb') as file:
+            if file.read(len(TRACE_MAGIC)) != TRACE_MAGIC:
+                raise ValueError(f'{filename} is not a trace file.')
+        self.filename = filename
+        if os.path.getsize(filename) == len(TRACE_MAGIC):
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        else:
+            self.records = np.memmap(filename, dtype=RECORD_DTYPE, mode='r', offset=len(TRACE_MAGIC))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index) -> Event:
+        return next(self._decode(self.records[[index]]))
+
+    def __iter__(self) -> Iterator[Event]:
+        for start in range(0, len(self.records), CHUNK_EVENTS):
+            yield from self._decode(self.records[start:start + CHUNK_EVENTS])
+
+    def append(self, *event):
+        raise TypeError('Trace files are read only, write them with a TraceWriter.')
+
+    @staticmethod
+    def _decode(records) -> Iterator[Event]:
+        kinds = records['kind'].tolist()
+        values = records['value'].tolist()
+        for kind, step, vertex, other, value in zip(
+            kinds, records['step'].tolist(), records['vertex'].tolist(), records['other'].tolist(), values,
+        ):
+            if kind & INT_VALUE:
+                yield Event(kind & KIND_MASK, step, vertex, other, int(value))
+            else:
+                yield Event(kind, step, vertex, other, value)
+
+    def path_events(self) -> List[Event]:
+        # The path is always written last, so only the end of the file needs reading.
+        kinds = self.records['kind']
+        start = len(kinds)
+        while start and kinds[start - 1] & KIND_MASK == PATH:
+            start -= 1
+        return list(self._decode(self.records[start:]))
+
+
+def expansions(events: List[Event]) -> Iterator[StepExpansion]:
+    """Fold a step's events back into one expansion per expanded vertex."""
+    for event in events:
+        if event.kind == EXPAND:
+            success, rejected = [], []
+        elif event.kind in (DISCOVER, RELAX):
+            success.append((event.other, event.value))
+        elif event.kind == FAIL_EDGE:
+            rejected.append(event.other)
+        elif event.kind == SETTLE:
+            yield event.vertex, event.other, success, rejected
+
+
+class TraceRecorder:
+    """
+    Steps a core search (BFS, Dijkstra and its descendants, or bidirectional), tracing every step.
+    Events go to a Trace in memory, or straight to disk if given a TraceWriter.
+    """
+
+    def __init__(self, search, trace: Trace = None):
+        self.search = search
+        self.trace = Trace() if trace is None else trace
+        self.n_steps = 0
+        self.finished = False
+        if isinstance(search, BidirectionalDijkstraSearch):
+            self.reached = ({search.source}, {search.target})
+        else:
+            self.reached = ({search.source}, set())
+
+    @property
+    def done(self) -> bool:
+        return self.search.done
+
+    def _distance(self, direction: int, vertex: int) -> float:
+        if isinstance(self.search, BidirectionalDijkstraSearch):
+            return self.search.sides[direction].distances[vertex]
+        distance = self.search.distances[vertex]
+        if isinstance(self.search, BFSSearch):
+            return float('inf') if distance == -1 else int(distance)
+        return distance
+
+    def _expansions(self):
+        if isinstance(self.search, BidirectionalDijkstraSearch):
+            direction, expansion = self.search.step()
+            return [(direction, expansion)]
+        if isinstance(self.search, BFSSearch):
+            return [(FORWARD, expansion) for expansion in self.search.step()]
+        return [(FORWARD, self.search.step())]
+
+    def step(self) -> List[Event]:
+        """Step the search once, returning the events it added to the trace."""
+        self.n_steps += 1
+        step, events = self.n_steps, []
+        for direction, (vertex, success, rejected) in self._expansions():
+            reached = self.reached[direction]
+            events.append(Event(EXPAND, step, vertex, direction, self._distance(direction, vertex)))
+            for end in success:
+                events.append(Event(RELAX if end in reached else DISCOVER, step, vertex, end, self._distance(direction, end)))
+                reached.add(end)
+            for end in rejected:
+                events.append(Event(FAIL_EDGE, step, vertex, end, self._distance(direction, end)))
+            events.append(Event(SETTLE, step, vertex, direction, self._distance(direction, vertex)))
+        for event in events:
+            self.trace.append(*event)
+        if self.done:
+            self.finish()
+        return events
+
+    def steps(self) -> Iterator[List[Event]]:
+        """Step the search until it is done, yielding each step's events as it goes."""
+        while not self.done:
+            yield self.step()
+        self.finish()
+
+    def run(self) -> 'TraceRecorder':
+        for _ in self.steps():
+            pass
+        return self
+
+    def finish(self):
+        """Append the path, once the search is done."""
+        if self.finished:
+            return
+        self.finished = True
+        search = self.search
+        if isinstance(search, BidirectionalDijkstraSearch):
+            path = search.path()
+            split = path.index(search.meeting[1]) if search.meeting is not None and path else len(path)
+            for index, vertex in enumerate(path):
+                if index < split or len(path) == 1:
+                    self.trace.append(PATH, 0, vertex, FORWARD, search.sides[FORWARD].distances[vertex])
+                else:
+                    self.trace.append(PATH, 0, vertex, BACKWARD, search.distance - search.sides[BACKWARD].distances[vertex])
+        elif search.target is not None:
+            for vertex in search.path():
+                self.trace.append(PATH, 0, vertex, FORWARD, self._distance(FORWARD, vertex))
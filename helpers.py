@@ -15,6 +15,10 @@ def unit_vec(vec):
     mag = magnitude(vec)
     return np.array([p/mag for p in vec])
 
+def unit_rows(vecs):
+    """unit_vec of every row at once."""
+    return vecs / np.sqrt((vecs ** 2).sum(axis=1))[:, None]
+
 def ratio_to_grad(c1, c2, ratio):
     col1 = hex_to_rgb(c1)
     col2 = hex_to_rgb(c2)
@@ -27,104 +31,259 @@ def ratio_to_grad(c1, c2, ratio):
 # Successive animation helpers
 
 class SuccessiveTransform(Transform):
+    """
+    Transform whose mobject is hidden until it starts. Which submobjects have been shown is kept on the
+    animation rather than the mobject, so edges can reuse their lines for later transforms.
+    """
+
+    def begin(self):
+        self.shown = {}
+        super().begin()
 
     def interpolate_submobject(self, submob, start, target_copy, alpha):
         if alpha == 0:
-            if not hasattr(submob, 'beginning_opacity'):
-                submob.beginning_opacity = 1
+            if id(submob) not in self.shown:
+                self.shown[id(submob)] = False
                 submob.set_opacity(0)
-                submob.opacity_updated = False
-                return
         else:
-            if not submob.opacity_updated:
-                submob.set_opacity(submob.beginning_opacity)
-                submob.opacity_updated = True
+            if not self.shown[id(submob)]:
+                submob.set_opacity(1)
+                self.shown[id(submob)] = True
             super().interpolate_submobject(submob, start, target_copy, alpha)
 
-def change_rate_func(b_time, m_time, e_time, b_func, m_func, e_func):
+class Timeline(AnimationGroup):
     """
-    Makes the animation do nothing for the first `ratio * run_time` seconds.
+    Animations laid out on one clock as (start, end, animation) intervals. Each frame only interpolates
+    the animations playing at that moment, one that hasn't started yet is left as begin() set it up and
+    one that has finished is interpolated to its end once, so a frame costs as much as the animations
+    currently moving rather than every animation in the scene.
+
+    Timelines passed in are merged, keeping their own start times. Plays like any other animation,
+    scene.play keyword arguments other than run_time and rate_func go on to the animations inside.
     """
-    def new_rate_func(t):
-        time_taken = t * (b_time + m_time + e_time)
-        if time_taken < b_time:
-            return b_func(time_taken / safe_division(b_time))
-        if time_taken < b_time + m_time:
-            return m_func((time_taken - b_time) / safe_division(m_time))
-        return e_func((time_taken - b_time - m_time) / safe_division(e_time))
-    return new_rate_func
 
-def safe_division(num):
-    return 1 / INF if num == 0 else num
+    def __init__(self, *animations, start=0, **kwargs):
+        self.intervals = []
+        for animation in animations:
+            if isinstance(animation, Timeline):
+                self.intervals.extend(
+                    (start + anim_start, start + anim_end, anim)
+                    for anim_start, anim_end, anim in animation.intervals
+                )
+            else:
+                self.intervals.append((start, start + animation.get_run_time(), animation))
+        self.intervals.sort(key=lambda interval: interval[0])
+        run_time = kwargs.pop('run_time', None)
+        super().__init__(*(anim for _, _, anim in self.intervals), **kwargs)
+        self.init_run_time()
+        self.run_time = self.max_end_time if run_time is None else run_time
 
-def stay_end(t):
-    return 1
+    def init_run_time(self):
+        self.max_end_time = max((end for _, end, _ in self.intervals), default=0)
+        self.started = 0
+        self.active = []
+        self.time = 0
 
-def stay_start(t):
-    return 0
+    def update_config(self, **kwargs):
+        super().update_config(**kwargs)
+        child_kwargs = {key: value for key, value in kwargs.items() if key not in ('run_time', 'rate_func')}
+        for _, _, anim in self.intervals:
+            anim.update_config(**child_kwargs)
 
-# There is probably a better way to do these two.
-def after_animation_separate(animation, *previous_anims):
-    rate_func = change_rate_func(
-        max(prev.get_run_time() for prev in previous_anims),
-        (
-            max(anim.get_run_time() for anim in animation.animations)
-            if isinstance(animation, AnimationGroup)
-            else animation.get_run_time()
-        ),
-        0,
-        stay_start,
-        (
-            animation.animations[0].get_rate_func()
-            if isinstance(animation, AnimationGroup)
-            else animation.get_rate_func()
-        ),
-        stay_end,
-    )
-    run_time = (
-        max(prev.get_run_time() for prev in previous_anims) +
-        (
-            max(anim.get_run_time() for anim in animation.animations)
-            if isinstance(animation, AnimationGroup)
-            else animation.get_run_time()
-        )
-    )
-    if isinstance(animation, AnimationGroup):
-        for anim in animation.animations:
-            anim.set_rate_func(rate_func)
-            anim.set_run_time(run_time)
-    else:
-        animation.set_rate_func(rate_func)
-        animation.set_run_time(run_time)
-    return animation
+    def update_mobjects(self, dt):
+        for _, _, anim in self.active:
+            anim.update_mobjects(dt)
 
+    def interpolate(self, alpha):
+        time = alpha * self.max_end_time
+        if time < self.time:
+            # Scenes only ever move forwards, but start over rather than skip anything if not.
+            self.started, self.active = 0, []
+        self.time = time
+        while self.started < len(self.intervals) and self.intervals[self.started][0] <= time:
+            self.active.append(self.intervals[self.started])
+            self.started += 1
+        still_active = []
+        for interval in self.active:
+            anim_start, anim_end, anim = interval
+            if time >= anim_end:
+                anim.interpolate(1)
+            else:
+                anim.interpolate((time - anim_start) / (anim_end - anim_start))
+                still_active.append(interval)
+        self.active = still_active
+
+def after_delay(animation, delay):
+    """
+    Makes the animation wait `delay` seconds before playing.
+    """
+    return Timeline(animation, start=delay)
+
+def after_animation_separate(animation, *previous_anims):
+    return after_delay(animation, max(prev.get_run_time() for prev in previous_anims))
 
 def after_animation_from_succession(anim_class, anim_args, anim_kwargs, *previous_anims):
     """
     Takes in a previous animation the next queued animation, and creates
     a new animation which waits for the previous animation to end before playing
     """
-    reference_anim = anim_class(*anim_args, **anim_kwargs)
-
-    rate_func = change_rate_func(
-        max(prev.get_run_time() for prev in previous_anims),
-        reference_anim.get_run_time(),
-        0,
-        stay_start,
-        reference_anim.get_rate_func(),
-        stay_end,
-    )
-    run_time = (
-        max(prev.get_run_time() for prev in previous_anims) +
-        reference_anim.get_run_time()
-    )
+    return after_animation_separate(anim_class(*anim_args, **anim_kwargs), *previous_anims)
+
+# Batched layers, many small shapes kept in arrays and drawn as a few mobjects.
+
+def as_rgb(color) -> np.ndarray:
+    """One colour as rgb, arrays of rgb values pass through."""
+    if isinstance(color, np.ndarray):
+        return color
+    return np.array(color_to_rgb(color), dtype=float)
+
+def rgb_codes(rgbs: np.ndarray):
+    """rgb values as 24 bit integers, so colours group and compare exactly."""
+    return np.round(np.clip(rgbs, 0, 1) * 255).astype(int) @ np.array([1 << 16, 1 << 8, 1])
+
+def code_to_hex(code) -> str:
+    return '#%06x' % int(code)
+
+def group_by_key(keys: np.ndarray):
+    """The distinct keys in order, with an ordering and split points that gather the indices of each."""
+    keys, inverse = np.unique(keys, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    order = np.argsort(inverse, kind='stable')
+    splits = np.cumsum(np.bincount(inverse, minlength=len(keys)))[:-1]
+    return keys, order, splits
+
+def refresh_layer(layer):
+    layer.refresh()
+
+class BatchedLayer:
+    """
+    Mixed into a mobject holding many shapes in flat arrays, indexed by slot, with an rgb row per slot in
+    rgbs. Subclasses set dirty whenever their arrays change and redraw in refresh(), which is done at
+    most once a frame however many slots change in it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dirty = False
+        self.n_playing = 0
+
+    def set_colors(self, slots, color):
+        """color is one colour for every slot, or an array of one rgb row per slot."""
+        self.rgbs[slots] = as_rgb(color)
+        self.dirty = True
 
-    anim_kwargs.update({
-        'rate_func': rate_func,
-        'run_time': run_time,
-    })
+    def slot_color(self, slot: int) -> str:
+        return code_to_hex(rgb_codes(self.rgbs[slot]))
 
-    return anim_class(*anim_args, **anim_kwargs)
+    def start_playing(self):
+        """Refresh every frame while animations on the layer play."""
+        if not self.n_playing:
+            self.add_updater(refresh_layer)
+        self.n_playing += 1
+
+    def stop_playing(self):
+        self.refresh()
+        self.n_playing = max(self.n_playing - 1, 0)
+        if not self.n_playing:
+            self.remove_updater(refresh_layer)
+
+    def refresh(self):
+        raise NotImplementedError
+
+    # Layers drawn as a VGroup keep one submobject per style.
+    def style_group(self, index: int, mobject_class) -> VMobject:
+        """The index-th submobject, made with mobject_class if there aren't that many yet."""
+        while len(self.submobjects) <= index:
+            self.add(mobject_class())
+        return self.submobjects[index]
+
+    def clear_groups(self, n_used: int):
+        for group in self.submobjects[n_used:]:
+            group.points = np.zeros((0, 3))
+
+class LayerAnimation(Animation):
+    """
+    Animates slots of a BatchedLayer in place. Unlike most animations nothing is copied when it begins and
+    nothing changes until it is first interpolated, so many can be laid out on one Timeline cheaply.
+
+    Slots can be staggered on the animation's own clock with delays and durations, each one number or
+    one per slot: a slot waits out its delay, then moves over its duration with the rate function, and
+    the animation runs until the last slot is done. So a whole wave of edges or cells, each starting and
+    taking its own time, is still one animation. Otherwise every slot moves together over run_time.
+    """
+
+    def __init__(self, layer: BatchedLayer, slots, delays=None, durations=None, **kwargs):
+        self.slots = np.asarray(slots, dtype=int)
+        self.delays = self.durations = None
+        if delays is not None or durations is not None:
+            if durations is None:
+                durations = kwargs.get('run_time', DEFAULT_ANIMATION_RUN_TIME)
+            self.delays = np.broadcast_to(np.asarray(0 if delays is None else delays, dtype=float), self.slots.shape)
+            self.durations = np.broadcast_to(np.asarray(durations, dtype=float), self.slots.shape)
+            kwargs['run_time'] = float((self.delays + self.durations).max(initial=0))
+        super().__init__(layer, **kwargs)
+
+    def begin(self):
+        self.mobject.start_playing()
+
+    def finish(self):
+        self.interpolate(1)
+        self.mobject.stop_playing()
+
+    def interpolate(self, alpha):
+        if self.delays is None:
+            super().interpolate(alpha)
+            return
+        time = min(max(alpha, 0), 1) * self.run_time
+        started = np.flatnonzero(self.delays <= time)
+        # A slot without a duration is done as soon as it starts.
+        local = np.clip((time - self.delays[started]) / np.maximum(self.durations[started], 1e-9), 0, 1)
+        moving = local < 1
+        eased = np.full(len(started), float(self.rate_func(1.0)))
+        eased[moving] = [self.rate_func(t) for t in local[moving].tolist()]
+        self.interpolate_slots(started, eased)
+
+    def interpolate_mobject(self, alpha):
+        self.interpolate_slots(np.arange(len(self.slots)), np.full(len(self.slots), float(alpha)))
+
+    def interpolate_slots(self, index: np.ndarray, alpha: np.ndarray):
+        """Move self.slots[index] to alpha each, eased already."""
+        raise NotImplementedError
+
+    def get_all_mobjects(self):
+        return [self.mobject]
+
+    def update_mobjects(self, dt):
+        pass
+
+class RecolorLayer(LayerAnimation):
+    """
+    Fades slots to color, from from_color or else whatever colour each has when its fade starts. Either
+    can be one colour or an array of one rgb row per slot.
+    """
+
+    def __init__(self, layer: BatchedLayer, slots, color, from_color=None, **kwargs):
+        super().__init__(layer, slots, **kwargs)
+        self.rgbs = np.broadcast_to(as_rgb(color), (len(self.slots), 3))
+        self.from_rgbs = None if from_color is None else np.broadcast_to(as_rgb(from_color), (len(self.slots), 3))
+        self.start_rgbs = None
+
+    def begin(self):
+        super().begin()
+        self.start_rgbs = None
+
+    def interpolate_slots(self, index, alpha):
+        if self.start_rgbs is None:
+            self.start_rgbs = np.zeros((len(self.slots), 3))
+            self.captured = np.zeros(len(self.slots), dtype=bool)
+        fresh = index[~self.captured[index]]
+        if len(fresh):
+            self.start_rgbs[fresh] = (
+                self.mobject.rgbs[self.slots[fresh]] if self.from_rgbs is None else self.from_rgbs[fresh]
+            )
+            self.captured[fresh] = True
+        start_rgbs = self.start_rgbs[index]
+        self.mobject.set_colors(self.slots[index], start_rgbs + (self.rgbs[index] - start_rgbs) * alpha[:, None])
 
 # Generating polygons encasing points/sets.
 
@@ -202,60 +361,48 @@ def generate_hull_about_points(points, **kwargs):
     return new_points
 
 def generate_strict_enclosure_on_points(points, MAX_INNER_ANGLE=270, **kwargs):
+    points = np.asarray(points)
     # First get the average of the points for the most natural radial search
-    middle = np.array([
-        sum(point[x] for point in points)/len(points)
-        for x in range(3)
-    ])
-    # Order then radially (clockwise)
-    q1, q2, q3, q4 = ([], [], [], [])
-    for point in points:
-        grad = (point[1] - middle[1]) / (point[0] - middle[0])
-        if point[0] > middle[0] and point[1] > middle[1]:
-            q1.append((point, grad))
-        if point[0] < middle[0] and point[1] > middle[1]:
-            q2.append((point, grad))
-        if point[0] < middle[0] and point[1] < middle[1]:
-            q3.append((point, grad))
-        if point[0] > middle[0] and point[1] < middle[1]:
-            q4.append((point, grad))
-    q1.sort(key=lambda px: px[1])
-    q2.sort(key=lambda px: px[1])
-    q3.sort(key=lambda px: px[1])
-    q4.sort(key=lambda px: px[1])
+    middle = points.sum(axis=0) / len(points)
+    # Order then radially (clockwise), by quadrant then gradient. Points level with the middle are left out.
+    offsets = points - middle
+    right, up = offsets[:, 0] > 0, offsets[:, 1] > 0
+    left, down = offsets[:, 0] < 0, offsets[:, 1] < 0
+    quadrants = np.select([right & up, left & up, left & down, right & down], [0, 1, 2, 3], -1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        grads = offsets[:, 1] / offsets[:, 0]
+    kept = np.flatnonzero(quadrants >= 0)
+    # lexsort is stable, so ties keep the order they were given in.
+    order = kept[np.lexsort((grads[kept], quadrants[kept]))]
     # make clockwise
-    sorted_points = list(map(lambda px: px[0], q1 + q2 + q3 + q4))[::-1]
+    sorted_points = points[order[::-1]]
     while True:
-        wrapped = [sorted_points[-1]] + sorted_points + [sorted_points[0]]
-        for index, (point1, point2, point3) in enumerate(zip(wrapped[:-2], wrapped[1:-1], wrapped[2:])):
-            vec1 = unit_vec(point2 - point1)
-            vec2 = unit_vec(point2 - point3)
-            # sin = determinate, cos = dotproduct
-            radians = np.arctan2(vec2[0]*vec1[1] - vec1[0]*vec2[1], np.dot(vec1, vec2))
-            if radians > MAX_INNER_ANGLE:
-                del sorted_points[index]
-                break
-        else:
+        vec1 = unit_rows(sorted_points - np.roll(sorted_points, 1, axis=0))
+        vec2 = unit_rows(sorted_points - np.roll(sorted_points, -1, axis=0))
+        # sin = determinate, cos = dotproduct
+        radians = np.arctan2(
+            vec2[:, 0] * vec1[:, 1] - vec1[:, 0] * vec2[:, 1], np.einsum('ij,ij->i', vec1, vec2),
+        )
+        too_wide = np.flatnonzero(radians > MAX_INNER_ANGLE)
+        if not len(too_wide):
             break
-    return sorted_points
+        sorted_points = np.delete(sorted_points, too_wide[0], axis=0)
+    return list(sorted_points)
 
 def buffer_polygon(points, BUFF_DIST=1.25, BUFF_SCALING=0.3, **kwargs):
-    poly_points = []
-    wrapped_points = [points[-1]] + points + [points[0]]
-    for point1, point2, point3 in zip(wrapped_points[:-2], wrapped_points[1:-1], wrapped_points[2:]):
-        vec1 = unit_vec(point2 - point1)
-        vec2 = unit_vec(point2 - point3)
-        combined = unit_vec(vec1 + vec2)
-        sin = vec2[0]*vec1[1] - vec2[1]*vec1[0]
-        if sin > 0:
-            # Inward meeting, combined should exert.
-            combined *= -1
-        poly_points.append(
-            point2 +  # Actual point
-            combined * BUFF_DIST +  # Buffer out
-            combined * BUFF_DIST * BUFF_SCALING * np.dot(vec1, vec2)  # Move further for tighter angles.
-        )
-    return poly_points
+    points = np.asarray(points)
+    vec1 = unit_rows(points - np.roll(points, 1, axis=0))
+    vec2 = unit_rows(points - np.roll(points, -1, axis=0))
+    combined = unit_rows(vec1 + vec2)
+    sin = vec2[:, 0] * vec1[:, 1] - vec2[:, 1] * vec1[:, 0]
+    # Inward meeting, combined should exert.
+    combined[sin > 0] *= -1
+    cos = np.einsum('ij,ij->i', vec1, vec2)
+    return list(
+        points +  # Actual point
+        combined * BUFF_DIST +  # Buffer out
+        combined * BUFF_DIST * BUFF_SCALING * cos[:, None]  # Move further for tighter angles.
+    )
 
 def generate_enclosure_on_points(points, method='strict', **kwargs):
     if len(points) == 1: